@@ -2,30 +2,29 @@ from pathlib import Path
 import json
 from typing import Dict, Any, List, Tuple
 
+from stage_io import export_json, load_stage, save_stage
+
 
 class BuildingCoordinateProcessor:
     def __init__(self):
         self.data_dir = Path(__file__).parent / "data"
         self.geojson_file = self.data_dir / "uiuc_buildings.geojson"
-        self.buildings_input_file = self.data_dir / "buildings_filtered.json"
-        self.buildings_output_file = self.data_dir / "buildings_enriched.json"
+        self.buildings_input_name = "buildings_filtered"
+        self.buildings_output_name = "buildings_enriched"
         self.canonical_file = self.data_dir / "buildings.json"
 
     def load_data(self) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        with open(self.geojson_file, "r") as f:
-            geojson_data = json.load(f)
-
-        with open(self.buildings_input_file, "r") as f:
-            building_data = json.load(f)
+        building_data = load_stage(self.data_dir, self.buildings_input_name)
+        return self.load_geojson(), building_data
 
-        return geojson_data, building_data
+    def load_geojson(self) -> Dict[str, Any]:
+        with open(self.geojson_file, "r") as f:
+            return json.load(f)
 
     def save_data(self, data: Dict[str, Any]) -> None:
-        with open(self.buildings_output_file, "w") as f:
-            json.dump(data, f, indent=2)
+        save_stage(data, self.data_dir, self.buildings_output_name)
         # Convenience: keep canonical buildings.json pointing at enriched output
-        with open(self.canonical_file, "w") as f:
-            json.dump(data, f, indent=2)
+        export_json(data, self.data_dir, self.buildings_output_name, self.canonical_file)
 
     def create_coordinates_map(
         self, geojson_data: Dict[str, Any]
@@ -53,17 +52,15 @@ class BuildingCoordinateProcessor:
 
         return building_data, buildings_updated
 
-    def process(self) -> None:
-        geojson_data, building_data = self.load_data()
-
+    def add_coordinates(
+        self, building_data: Dict[str, Any], geojson_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
         coordinates_map = self.create_coordinates_map(geojson_data)
 
         updated_data, buildings_updated = self.add_coordinates_to_buildings(
             building_data, coordinates_map
         )
 
-        self.save_data(updated_data)
-
         print("\nProcessing complete!")
         print(f"Added coordinates to {buildings_updated} buildings")
 
@@ -75,6 +72,12 @@ class BuildingCoordinateProcessor:
             for name in missing_coordinates:
                 print(f"- {name}")
 
+        return updated_data
+
+    def process(self) -> None:
+        geojson_data, building_data = self.load_data()
+        self.save_data(self.add_coordinates(building_data, geojson_data))
+
 
 def main():
     processor = BuildingCoordinateProcessor()
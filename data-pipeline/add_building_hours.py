@@ -3,11 +3,13 @@ import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from stage_io import load_stage, save_stage
+
 
 class BuildingHoursProcessor:
     def __init__(self):
         self.data_dir = Path(__file__).parent / "data"
-        self.buildings_file = self.data_dir / "buildings_filtered.json"
+        self.buildings_name = "buildings_filtered"
         self.hours_file = self.data_dir / "building_hours.json"
         self.days_mapping = {
             "M-TH": ["monday", "tuesday", "wednesday", "thursday"],
@@ -17,17 +19,15 @@ class BuildingHoursProcessor:
         }
 
     def load_data(self) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        with open(self.buildings_file, "r") as f:
-            buildings_data = json.load(f)
+        buildings_data = load_stage(self.data_dir, self.buildings_name)
+        return buildings_data, self.load_hours()
 
+    def load_hours(self) -> Dict[str, Any]:
         with open(self.hours_file, "r") as f:
-            hours_data = json.load(f)
-
-        return buildings_data, hours_data
+            return json.load(f)
 
     def save_data(self, data: Dict[str, Any]) -> None:
-        with open(self.buildings_file, "w") as f:
-            json.dump(data, f, indent=2)
+        save_stage(data, self.data_dir, self.buildings_name)
 
     def convert_time_format(self, time_str: str) -> Optional[str]:
         if time_str == "LOCKED":
@@ -71,9 +71,9 @@ class BuildingHoursProcessor:
 
         return formatted_hours
 
-    def process(self) -> None:
-        buildings_data, hours_data = self.load_data()
-
+    def add_hours(
+        self, buildings_data: Dict[str, Any], hours_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
         buildings_updated = 0
         for building_name in buildings_data["buildings"]:
             if building_name in hours_data:
@@ -83,8 +83,6 @@ class BuildingHoursProcessor:
                 buildings_updated += 1
                 print(f"Updated hours for: {building_name}")
 
-        self.save_data(buildings_data)
-
         print("\nProcessing complete!")
         print(f"Updated hours for {buildings_updated} buildings")
 
@@ -96,6 +94,12 @@ class BuildingHoursProcessor:
             for name in missing_hours:
                 print(f"- {name}")
 
+        return buildings_data
+
+    def process(self) -> None:
+        buildings_data, hours_data = self.load_data()
+        self.save_data(self.add_hours(buildings_data, hours_data))
+
 
 def main():
     processor = BuildingHoursProcessor()
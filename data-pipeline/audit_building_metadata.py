@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-import json
 import os
 from pathlib import Path
 from typing import Any, Dict, List
 
+from stage_io import export_json, load_stage, save_stage
+
 
 DATA_DIR = Path(__file__).parent / "data"
-ENRICHED_FILE = DATA_DIR / "buildings_enriched.json"
+ENRICHED_STAGE = "buildings_enriched"
 CANONICAL_FILE = DATA_DIR / "buildings.json"
 
 REQUIRED_BUILDING_KEYS = {"hours", "coordinates", "rooms"}
@@ -125,17 +126,14 @@ def emit_github_warnings(issues: List[Dict[str, Any]]) -> None:
         print(f"::warning title=Building metadata::{escaped_message}")
 
 
-def main() -> None:
-    with open(ENRICHED_FILE, "r") as enriched_file:
-        building_data = json.load(enriched_file)
-
+def apply_audit(
+    building_data: Dict[str, Any]
+) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Audit the dataset, report issues, and drop buildings that cannot be loaded."""
     issues = audit_buildings(building_data["buildings"])
 
     if issues:
-        filtered_data = remove_incomplete_buildings(building_data, issues)
-        for output_file in (ENRICHED_FILE, CANONICAL_FILE):
-            with open(output_file, "w") as output:
-                json.dump(filtered_data, output, indent=2)
+        building_data = remove_incomplete_buildings(building_data, issues)
 
         print(
             f"\nWarning: excluded {len(issues)} building(s) with incomplete metadata."
@@ -147,6 +145,15 @@ def main() -> None:
 
     emit_github_warnings(issues)
     write_github_summary(issues)
+    return building_data, issues
+
+
+def main() -> None:
+    building_data, issues = apply_audit(load_stage(DATA_DIR, ENRICHED_STAGE))
+
+    if issues:
+        save_stage(building_data, DATA_DIR, ENRICHED_STAGE)
+        export_json(building_data, DATA_DIR, ENRICHED_STAGE, CANONICAL_FILE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""Compare parse throughput of the one_shot_scraper HTML backends.
+
+Runs the scraper's parse functions over saved Course Explorer pages with each
+backend in HTML_BACKENDS, checks that every backend produces the same output,
+and reports pages/s per backend.
+
+Usage: python benchmark_html_parsers.py PAGE_OR_DIR [...] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+from one_shot_scraper import HTML_BACKENDS, scrape_courses, scrape_sections, scrape_subjects
+
+SECTION_TABLE_MARKER = 'schedule-course-table'
+
+
+def load_pages(paths):
+    pages = []
+    for path in map(Path, paths):
+        files = sorted(path.glob('*.html')) if path.is_dir() else [path]
+        for file in files:
+            pages.append((file.name, file.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+
+def parse_page(html_content, backend):
+    # Section pages only go through scrape_sections; subject and course
+    # listing pages share the same table layout, so run both listing parsers.
+    # The scrapers' per-meeting warnings are silenced to keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        if SECTION_TABLE_MARKER in html_content:
+            return scrape_sections(html_content, backend=backend)
+        return scrape_subjects(html_content, backend=backend), scrape_courses(html_content, backend=backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark one_shot_scraper HTML parser backends')
+    parser.add_argument('paths', nargs='+', help='Saved .html pages or directories containing them')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the pages per backend (default: 3)')
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths)
+    if not pages:
+        print("No .html pages found")
+        sys.exit(1)
+    total_bytes = sum(len(html_content) for _, html_content in pages)
+    print(f"Loaded {len(pages)} pages ({total_bytes / 1024:.0f} KB)")
+
+    expected = {name: parse_page(html_content, HTML_BACKENDS[0]) for name, html_content in pages}
+    mismatches = 0
+    for backend in HTML_BACKENDS[1:]:
+        for name, html_content in pages:
+            if parse_page(html_content, backend) != expected[name]:
+                print(f"  Output mismatch: {backend} vs {HTML_BACKENDS[0]} on {name}")
+                mismatches += 1
+
+    print(f"\n{'Backend':<10}{'Pages/s':>10}{'MB/s':>10}{'Speedup':>10}")
+    baseline = None
+    for backend in HTML_BACKENDS:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, html_content in pages:
+                parse_page(html_content, backend)
+        elapsed = time.perf_counter() - start
+        pages_per_second = len(pages) * args.repeat / elapsed
+        baseline = baseline or pages_per_second
+        mb_per_second = total_bytes * args.repeat / elapsed / 1024 / 1024
+        print(f"{backend:<10}{pages_per_second:>10.1f}{mb_per_second:>10.2f}{pages_per_second / baseline:>9.1f}x")
+
+    if mismatches:
+        print(f"\n{mismatches} page(s) parsed differently across backends")
+        sys.exit(1)
+    print("\nAll backends produced identical output")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Compare the REST and COPY class_schedule loads against a local Postgres.
+
+Applies database/schema/tables.sql and promote_schedule_load in a scratch
+schema of the database at `--dsn`, seeds buildings and rooms, and loads
+the rows load_to_postgres.py would build from a buildings_derived file
+into class_schedule_shadow:
+
+  rest  what PostgREST runs for each 1000-row JSON insert the REST loader
+        sends (json_populate_recordset, one transaction per chunk). HTTP
+        and gateway time are not included, so this is a lower bound for
+        the real REST load
+  copy  copy_loader.copy_class_schedule: binary COPY in one transaction
+
+then promotes them into class_schedule with promote_schedule_load. Each
+pass starts from a full table, as the weekly load does, and the scratch
+schema is dropped at the end.
+
+Usage: python benchmark_schedule_load.py --dsn postgresql://... [BUILDINGS_DERIVED_JSON] [--copies N] [--repeat N]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+
+from copy_loader import SCHEDULE_COLUMNS, SHADOW_TABLE, copy_class_schedule
+
+DEFAULT_INPUT = Path(__file__).parent / "archive" / "buildings_derived_FA25.json"
+DATABASE_DIR = Path(__file__).parent.parent / "database"
+TABLES_SQL = DATABASE_DIR / "schema" / "tables.sql"
+PROMOTE_SQL = DATABASE_DIR / "functions" / "promote_schedule_load.sql"
+SCHEMA = "schedule_load_benchmark"
+CHUNK_SIZE = 1000
+
+
+def build_schedules(data, copies):
+    """Expand classes into one row per meeting day, like prepare_and_validate_data."""
+    rooms = []
+    schedules = []
+    for name, building in data["buildings"].items():
+        for room_number, classes in building["rooms"].items():
+            rooms.append((name, room_number))
+            for class_info in classes:
+                for day in class_info["days"]:
+                    schedules.append(
+                        {
+                            "building_name": name,
+                            "room_number": room_number,
+                            "course_code": class_info["course"],
+                            "course_title": class_info["title"],
+                            "start_time": class_info["time"]["start"],
+                            "end_time": class_info["time"]["end"],
+                            "day_of_week": day,
+                            "start_date": class_info["start_date"],
+                            "end_date": class_info["end_date"],
+                        }
+                    )
+    return rooms, schedules * copies
+
+
+def rest_load(conn, schedules):
+    columns = ", ".join(SCHEDULE_COLUMNS)
+    conn.execute(f"DELETE FROM {SHADOW_TABLE}")
+    for i in range(0, len(schedules), CHUNK_SIZE):
+        conn.execute(
+            f"INSERT INTO {SHADOW_TABLE} ({columns}) SELECT {columns} "
+            f"FROM json_populate_recordset(NULL::{SHADOW_TABLE}, %s)",
+            (json.dumps(schedules[i : i + CHUNK_SIZE]),),
+        )
+
+
+def promote(conn, schedules):
+    conn.execute("SELECT promote_schedule_load(%s, 0)", (len(schedules),))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark class_schedule load backends")
+    parser.add_argument("input", nargs="?", default=str(DEFAULT_INPUT),
+                        help="buildings_derived JSON to load (default: archive/buildings_derived_FA25.json)")
+    parser.add_argument("--dsn", required=True, help="Postgres connection string; a scratch schema is created in it")
+    parser.add_argument("--copies", type=int, default=1, help="Repeat the schedule rows N times (default: 1)")
+    parser.add_argument("--repeat", type=int, default=5, help="Loads per backend; the median is reported (default: 5)")
+    args = parser.parse_args()
+
+    with open(args.input, "r") as f:
+        rooms, schedules = build_schedules(json.load(f), args.copies)
+    print(f"Loading {len(schedules)} class_schedule rows from {args.input}")
+
+    dsn = make_conninfo(args.dsn, options=f"-c search_path={SCHEMA}")
+    with psycopg.connect(args.dsn, autocommit=True) as admin:
+        admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        admin.execute(f"CREATE SCHEMA {SCHEMA}")
+    try:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute(TABLES_SQL.read_text())
+            # The function pins its search_path to public
+            conn.execute(PROMOTE_SQL.read_text().replace("pg_catalog, public", f"pg_catalog, {SCHEMA}"))
+            with conn.cursor() as cur:
+                cur.executemany(
+                    "INSERT INTO buildings (name) VALUES (%s)",
+                    [(name,) for name in dict.fromkeys(name for name, _ in rooms)],
+                )
+                cur.executemany("INSERT INTO rooms VALUES (%s, %s)", rooms)
+            rest_load(conn, schedules)
+            promote(conn, schedules)
+
+            timings = {"rest": [], "copy": []}
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                rest_load(conn, schedules)
+                promote(conn, schedules)
+                timings["rest"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                rows = copy_class_schedule(dsn, schedules).rows
+                promote(conn, schedules)
+                timings["copy"].append(time.perf_counter() - start)
+
+                count = conn.execute("SELECT count(*) FROM class_schedule").fetchone()[0]
+                if rows != len(schedules) or count != len(schedules):
+                    raise ValueError(f"Expected {len(schedules)} rows, COPY loaded {rows}, table has {count}")
+    finally:
+        with psycopg.connect(args.dsn, autocommit=True) as admin:
+            admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+    # Clear, chunks and promote for REST; COPY session and promote for COPY
+    round_trips = {"rest": 2 + (len(schedules) + CHUNK_SIZE - 1) // CHUNK_SIZE, "copy": 2}
+    baseline = statistics.median(timings["rest"])
+    print(f"\n{'Backend':<10}{'median s':>10}{'rows/s':>12}{'requests':>10}{'speedup':>9}")
+    for backend, passes in timings.items():
+        seconds = statistics.median(passes)
+        print(
+            f"{backend:<10}{seconds:>10.2f}{len(schedules) / seconds:>12.0f}"
+            f"{round_trips[backend]:>10}{baseline / seconds:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
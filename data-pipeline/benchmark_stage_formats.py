@@ -0,0 +1,96 @@
+"""Compare stage I/O time and file size of the PIPELINE_FORMAT options.
+
+Replays the reads and writes the building stages make, from
+filter_buildings.py through load_to_postgres.py, on a buildings_derived
+file in each format of stage_io.FORMATS, and checks that every format
+round-trips the data unchanged.
+
+Usage: python benchmark_stage_formats.py [BUILDINGS_DERIVED_JSON] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from stage_io import FORMATS, export_json, load_stage, save_stage, stage_file
+
+DEFAULT_INPUT = Path(__file__).parent / "archive" / "buildings_derived_FA25.json"
+
+# (stage, operation, stage file) in pipeline order
+STAGE_IO = [
+    ("subject_to_buildings", "save", "buildings_derived"),
+    ("filter_buildings", "load", "buildings_derived"),
+    ("filter_buildings", "save", "buildings_filtered"),
+    ("add_building_hours", "load", "buildings_filtered"),
+    ("add_building_hours", "save", "buildings_filtered"),
+    ("add_building_coordinates", "load", "buildings_filtered"),
+    ("add_building_coordinates", "save", "buildings_enriched"),
+    ("add_building_coordinates", "export", "buildings_enriched"),
+    ("audit_building_metadata", "load", "buildings_enriched"),
+    ("load_to_postgres", "load", "buildings_enriched"),
+]
+
+
+def run_pipeline_io(data, data_dir):
+    timings = {}
+    for stage, operation, name in STAGE_IO:
+        start = time.perf_counter()
+        loaded = None
+        if operation == "load":
+            loaded = load_stage(data_dir, name)
+        elif operation == "save":
+            save_stage(data, data_dir, name)
+        else:
+            export_json(data, data_dir, name, data_dir / "buildings.json")
+        timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+        if loaded is not None and loaded != data:
+            raise ValueError(f"{name} did not round-trip")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stage file formats")
+    parser.add_argument("input", nargs="?", default=str(DEFAULT_INPUT),
+                        help="buildings_derived JSON to replay (default: archive/buildings_derived_FA25.json)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per format; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    with open(args.input, "r") as f:
+        data = json.load(f)
+    print(f"Replaying stage I/O on {args.input} ({len(data['buildings'])} buildings)")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in FORMATS:
+            os.environ["PIPELINE_FORMAT"] = fmt
+            data_dir = Path(tmp) / fmt
+            data_dir.mkdir()
+            try:
+                passes = [run_pipeline_io(data, data_dir) for _ in range(args.repeat)]
+            except ImportError as e:
+                print(f"Skipping {fmt}: {e}")
+                continue
+            best = min(passes, key=lambda timings: sum(timings.values()))
+            size = stage_file(data_dir, "buildings_enriched").stat().st_size
+            results[fmt] = (best, size)
+
+    if not results:
+        sys.exit(1)
+    baseline = sum(results[FORMATS[0]][0].values()) if FORMATS[0] in results else None
+    print(f"\n{'Stage':<28}" + "".join(f"{fmt + ' ms':>14}" for fmt in results))
+    for stage in dict.fromkeys(stage for stage, _, _ in STAGE_IO):
+        print(f"{stage:<28}" + "".join(f"{timings[stage] * 1000:>14.1f}" for timings, _ in results.values()))
+    print(f"{'Total':<28}" + "".join(f"{sum(timings.values()) * 1000:>14.1f}" for timings, _ in results.values()))
+    print(f"{'Stage file MB':<28}" + "".join(f"{size / 1024 / 1024:>14.2f}" for _, size in results.values()))
+    if baseline:
+        print(f"{'Speedup':<28}" + "".join(
+            f"{baseline / sum(timings.values()):>13.1f}x" for timings, _ in results.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare peak memory of collecting vs streaming scraper output.
+
+Generates a synthetic term of subjects and writes it to subjects.json two
+ways, each in a fresh process so peak RSS is measured independently:
+
+  baseline interpreter and imports only, subtracted from the others
+  collect  every Subject kept until the end, then dumped in one json.dump
+           (how the scraper saved its output before SubjectsWriter)
+  stream   each subject written by SubjectsWriter as soon as it is built
+
+Usage: python benchmark_subjects_memory.py [--subjects N] [--courses N] [--sections N]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from one_shot_scraper import Course, Location, Section, Subject, TimeSlot
+from subjects_stream import SubjectsWriter, iter_subjects
+
+MODES = ('baseline', 'collect', 'stream')
+
+
+def build_subject(i, courses, sections):
+    code = f"S{i:03d}"
+    subject = Subject(code=code, name=f"Subject {code}")
+    for j in range(courses):
+        course = Course(number=f"{code} {100 + j}", title=f"Course {j} of {code}")
+        for k in range(sections):
+            hour = 8 + (j + k) % 10
+            course.sections.append(Section(
+                time=TimeSlot(start=f"{hour:02d}:00", end=f"{hour:02d}:50"),
+                location=Location(building=f"Building {k % 40}", room=f"{100 + k}"),
+                days=["M", "W", "F"] if k % 2 else ["T", "R"],
+                start_date="2025-08-25",
+                end_date="2025-12-10",
+            ))
+        subject.courses.append(course)
+    return subject
+
+
+def run_mode(mode, path, subjects, courses, sections):
+    if mode == 'collect':
+        collected = [build_subject(i, courses, sections) for i in range(subjects)]
+        data = {"year": 2025, "term": "fall", "subjects": [asdict(subject) for subject in collected]}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    elif mode == 'stream':
+        with SubjectsWriter(path, 2025, "fall") as writer:
+            for i in range(subjects):
+                writer.write(asdict(build_subject(i, courses, sections)))
+            writer.close()
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != 'darwin' else peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark peak RSS of subjects.json writers')
+    parser.add_argument('--subjects', type=int, default=200, help='Subjects in the synthetic term (default: 200)')
+    parser.add_argument('--courses', type=int, default=40, help='Courses per subject (default: 40)')
+    parser.add_argument('--sections', type=int, default=12, help='Sections per course (default: 12)')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(run_mode(args.mode, Path(args.output), args.subjects, args.courses, args.sections))
+        return
+
+    sections = args.subjects * args.courses * args.sections
+    print(f"Synthetic term: {args.subjects} subjects, {args.subjects * args.courses} courses, {sections} sections")
+    print(f"\n{'Mode':<10}{'Peak RSS MB':>13}{'Above idle':>12}{'Seconds':>10}{'Output MB':>11}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in MODES:
+            output = Path(tmp) / f"{mode}.json"
+            start = time.perf_counter()
+            peak = float(subprocess.check_output([
+                sys.executable, __file__, '--mode', mode, '--output', str(output),
+                '--subjects', str(args.subjects), '--courses', str(args.courses), '--sections', str(args.sections),
+            ], text=True).strip().splitlines()[-1])
+            elapsed = time.perf_counter() - start
+            results[mode] = output
+            if mode == 'baseline':
+                idle = peak
+            size = output.stat().st_size / 1024 / 1024 if output.exists() else 0
+            print(f"{mode:<10}{peak:>13.1f}{peak - idle:>12.1f}{elapsed:>10.2f}{size:>11.1f}")
+
+        with open(results['collect']) as f:
+            collected = json.load(f)["subjects"]
+        if list(iter_subjects(results['stream'])) != collected:
+            print("\nStreamed output differs from collected output")
+            sys.exit(1)
+    print("\nBoth writers produced the same subjects")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+"""Send rows to PostgREST in size-bounded chunks over a small worker pool.
+
+One request with every row risks PostgREST's payload limit and the
+statement timeout, and a failure loses all of it. `insert_chunks` splits
+the rows into chunks bounded by row count and JSON size, sends them
+concurrently, retries chunks that fail with a transient error with
+exponential backoff, and reports throughput and the per-chunk latency
+distribution.
+
+Only errors that show the chunk was not written are retried: failed
+connections, 429 and 503 responses, and statements Postgres rolled back
+(serialization failure, deadlock, statement timeout). A read timeout or a
+502/504 can arrive after the insert committed, and retrying it would
+duplicate the rows, so those chunks are reported as failed instead.
+
+With `target_seconds`, chunk sizes adapt to the endpoint: ChunkSizer
+tracks the observed seconds per byte of JSON and sizes each new chunk so
+its request takes about that long, within `max_bytes` and `max_rows`, and
+halves the size after a failed attempt.
+
+The caller supplies the request for one chunk, e.g.
+`lambda chunk: supabase.table("daily_events").insert(chunk).execute()`,
+so any client pointed at any PostgREST-compatible endpoint works.
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from postgrest.exceptions import APIError
+
+DEFAULT_MAX_ROWS = 1000
+# PostgREST behind Supabase rejects bodies over a few MB; stay well below
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_WORKERS = 4
+DEFAULT_ATTEMPTS = 4
+RETRY_BACKOFF_SECONDS = 1
+RETRY_MAX_BACKOFF_SECONDS = 30
+# Adaptive sizing starts small, so a slow endpoint is detected after one
+# round of requests, and never goes below MIN_ADAPTIVE_BYTES
+INITIAL_ADAPTIVE_BYTES = 128 * 1024
+MIN_ADAPTIVE_BYTES = 16 * 1024
+# Weight of the newest latency sample in the seconds-per-byte average
+LATENCY_EWMA_ALPHA = 0.3
+
+# HTTP statuses returned before the request reaches the database: rate
+# limited, or no upstream available. APIError.code holds the status when
+# the error body is not PostgREST JSON
+TRANSIENT_HTTP_STATUSES = {429, 503}
+# Postgres SQLSTATEs of statements that were rolled back: serialization
+# failure, deadlock, too many connections, statement timeout
+TRANSIENT_SQLSTATES = {"40001", "40P01", "53300", "57014"}
+# Transport errors raised before the request was sent
+UNSENT_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, UNSENT_TRANSPORT_ERRORS):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code)
+        return code in TRANSIENT_SQLSTATES or (
+            code.isdigit() and int(code) in TRANSIENT_HTTP_STATUSES
+        )
+    return False
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def record_sizes(records: List[Dict]) -> List[int]:
+    """JSON size of each record in a chunk, separator included."""
+    return [len(json.dumps(record)) + 1 for record in records]
+
+
+def cut_chunk(
+    records: List[Dict], sizes: List[int], start: int, max_rows: int, max_bytes: int
+) -> Tuple[List[Dict], int]:
+    """The chunk starting at `start` and its JSON size.
+
+    It holds at most `max_rows` records and, unless one record is larger
+    on its own, at most `max_bytes` of JSON.
+    """
+    end = start
+    size = 2  # the enclosing []
+    while end < len(records) and end - start < max_rows:
+        if end > start and size + sizes[end] > max_bytes:
+            break
+        size += sizes[end]
+        end += 1
+    return records[start:end], size
+
+
+def chunk_records(
+    records: List[Dict], max_rows: int = DEFAULT_MAX_ROWS, max_bytes: int = DEFAULT_MAX_BYTES
+) -> List[Tuple[int, List[Dict]]]:
+    """Split records into (start index, chunk) pairs, in order."""
+    sizes = record_sizes(records)
+    chunks = []
+    start = 0
+    while start < len(records):
+        chunk, _ = cut_chunk(records, sizes, start, max_rows, max_bytes)
+        chunks.append((start, chunk))
+        start += len(chunk)
+    return chunks
+
+
+class ChunkSizer:
+    """Byte budget for the next chunk.
+
+    Fixed at `max_bytes` without `target_seconds`. With it, the budget is
+    target_seconds over an EWMA of the seconds per byte of successful
+    requests, at most doubling per request, between MIN_ADAPTIVE_BYTES and
+    `max_bytes`; a failed attempt halves it.
+    """
+
+    def __init__(self, max_bytes: int, target_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.target_seconds = target_seconds
+        self.min_bytes = min(MIN_ADAPTIVE_BYTES, max_bytes)
+        self.bytes = max_bytes if target_seconds is None else min(INITIAL_ADAPTIVE_BYTES, max_bytes)
+        self.seconds_per_byte: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def observe(self, size: int, seconds: float) -> None:
+        if self.target_seconds is None:
+            return
+        with self.lock:
+            sample = seconds / size
+            if self.seconds_per_byte is None:
+                self.seconds_per_byte = sample
+            else:
+                self.seconds_per_byte += LATENCY_EWMA_ALPHA * (sample - self.seconds_per_byte)
+            target = self.target_seconds / self.seconds_per_byte if self.seconds_per_byte else self.max_bytes
+            self.bytes = int(max(self.min_bytes, min(self.max_bytes, target, self.bytes * 2)))
+
+    def backoff(self) -> None:
+        if self.target_seconds is None:
+            return
+        with self.lock:
+            self.bytes = max(self.min_bytes, self.bytes // 2)
+
+
+@dataclass
+class InsertReport:
+    rows: int = 0
+    chunks: int = 0
+    retries: int = 0
+    adaptive: bool = False
+    # Row counts of the chunks, in the order they were cut
+    chunk_rows: List[int] = field(default_factory=list)
+    seconds: float = 0.0
+    # Latency of each chunk's successful request
+    latencies: List[float] = field(default_factory=list)
+    # (start index, chunk, error) of chunks that failed every attempt
+    failed_chunks: List[Tuple[int, List[Dict], Exception]] = field(default_factory=list)
+
+    @property
+    def failed_rows(self) -> int:
+        return sum(len(chunk) for _, chunk, _ in self.failed_chunks)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def print_summary(self, label: str) -> None:
+        print(
+            f"{label}: {self.rows} rows in {self.chunks - len(self.failed_chunks)}/{self.chunks} "
+            f"chunks, {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s), "
+            f"{self.retries} retries"
+        )
+        if self.adaptive and len(self.chunk_rows) > 1:
+            print(
+                f"  Chunk size: {min(self.chunk_rows)}-{max(self.chunk_rows)} rows, "
+                f"last {self.chunk_rows[-1]}"
+            )
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            print(
+                f"  Chunk latency: p50 {percentile(latencies, 0.5) * 1000:.0f}ms, "
+                f"p90 {percentile(latencies, 0.9) * 1000:.0f}ms, "
+                f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms, "
+                f"max {latencies[-1] * 1000:.0f}ms"
+            )
+        if self.failed_chunks:
+            print(f"  Failed: {len(self.failed_chunks)} chunks ({self.failed_rows} rows)")
+
+
+def insert_chunks(
+    send: Callable[[List[Dict]], Any],
+    records: List[Dict],
+    label: str,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    workers: int = DEFAULT_WORKERS,
+    attempts: int = DEFAULT_ATTEMPTS,
+    target_seconds: Optional[float] = None,
+) -> InsertReport:
+    """Call `send` on each chunk of `records`, `workers` chunks at a time.
+
+    Chunks that still fail after `attempts` tries, or fail with an error
+    that is not transient, are listed in the report's failed_chunks; the
+    other chunks are sent regardless. With `target_seconds`, chunks are cut
+    as workers become free, sized by ChunkSizer.
+    """
+    sizes = record_sizes(records)
+    sizer = ChunkSizer(max_bytes, target_seconds)
+    # Fixed chunks are numbered out of the total; adaptive ones can't be
+    total = len(chunk_records(records, max_rows, max_bytes)) if target_seconds is None else None
+    report = InsertReport(adaptive=target_seconds is not None)
+    lock = threading.Lock()
+    next_start = 0
+
+    def next_chunk() -> Optional[Tuple[int, int, List[Dict], int]]:
+        nonlocal next_start
+        with lock:
+            if next_start >= len(records):
+                return None
+            start = next_start
+            chunk, size = cut_chunk(records, sizes, start, max_rows, sizer.bytes)
+            next_start += len(chunk)
+            report.chunks += 1
+            report.chunk_rows.append(len(chunk))
+            return report.chunks, start, chunk, size
+
+    def send_chunk(number: int, start: int, chunk: List[Dict], size: int) -> None:
+        name = f"{number}/{total}" if total else f"{number}"
+        for attempt in range(1, attempts + 1):
+            started_at = time.monotonic()
+            try:
+                send(chunk)
+            except Exception as e:
+                sizer.backoff()
+                if attempt == attempts or not is_transient(e):
+                    print(f"Error sending chunk {name} of {label}: {e}")
+                    with lock:
+                        report.failed_chunks.append((start, chunk, e))
+                    return
+                delay = min(
+                    RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)), RETRY_MAX_BACKOFF_SECONDS
+                )
+                sleep_for = random.uniform(delay / 2, delay)
+                print(
+                    f"Chunk {name} of {label} failed (attempt "
+                    f"{attempt}/{attempts}): {e}. Retrying in {sleep_for:.1f} seconds"
+                )
+                with lock:
+                    report.retries += 1
+                time.sleep(sleep_for)
+                continue
+            latency = time.monotonic() - started_at
+            sizer.observe(size, latency)
+            with lock:
+                report.latencies.append(latency)
+                report.rows += len(chunk)
+            return
+
+    def worker() -> None:
+        while (job := next_chunk()) is not None:
+            send_chunk(*job)
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in [pool.submit(worker) for _ in range(max(1, workers))]:
+            future.result()
+    report.seconds = time.monotonic() - started_at
+    report.failed_chunks.sort(key=lambda failed: failed[0])
+    return report
@@ -0,0 +1,164 @@
+"""Compare the row-by-row and vectorized daily-events validation.
+
+Generates a synthetic Tableau DailyEvents CSV, parses it with
+read_events, and validates and serializes the events for Supabase both
+with the per-row `iterrows()` loop load_to_postgres used to run and with
+prepare_events, checking that both produce the same events and the same
+invalid_events reasons. No database is needed: the valid-room set is
+synthetic too.
+
+Usage: python cron/benchmark_daily_events.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+
+from tableau_dailyevents_scraper import prepare_events, read_events
+
+BUILDINGS = [f"Building {i}" for i in range(60)]
+ROOMS = [str(100 + i) for i in range(40)]
+
+
+def synthetic_csv(rows, seed=0):
+    """Tableau-shaped CSV with some missing fields and unknown rooms."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        day = 1 + i % 28
+        hour = 7 + rng.randrange(12)
+        start = f"{hour % 12 or 12}:{rng.choice(['00', '30'])}:00 {'AM' if hour < 12 else 'PM'}"
+        end_hour = hour + 1
+        end = f"{end_hour % 12 or 12}:20:00 {'AM' if end_hour < 12 else 'PM'}"
+        records.append({
+            "Building": rng.choice(BUILDINGS),
+            "Customer": "" if i % 7 == 0 else f"Department {i % 90}",
+            "CustomerContact": f"contact{i % 50}@illinois.edu",
+            "EventName": "" if i % 97 == 0 else f"Event {i}",
+            # Rooms 140-144 are not in the valid-room set
+            "Room": str(100 + rng.randrange(45)),
+            "StartDate": f"10/{day:02d}/2025",
+            "StartTime": f"12/30/1899 {start}",
+            "EndTime": "not a time" if i % 211 == 0 else f"10/{day:02d}/2025 {end}",
+            "Measure Values": 1,
+            "Open/Close": "Open",
+            "Measure Names": "Count",
+        })
+    return pd.DataFrame(records).to_csv(index=False)
+
+
+def legacy_prepare_events(df, valid_rooms):
+    """The per-row loop load_to_postgres ran before prepare_events."""
+    events_to_insert = []
+    invalid_events = []
+    for index, row in df.iterrows():
+        building_name = row['building_name']
+        room_number = row['room_number']
+        event_name = row['event_name']
+        start_time = row['start_time']
+        end_time = row['end_time']
+        occupant = row['occupant']
+
+        if pd.isna(start_time) or pd.isna(end_time):
+            invalid_events.append({
+                'building_name': building_name,
+                'room_number': room_number,
+                'event_name': event_name,
+                'reason': 'Invalid timestamp'
+            })
+            continue
+
+        if pd.isna(building_name) or pd.isna(room_number) or pd.isna(event_name):
+            invalid_events.append({
+                'building_name': str(building_name),
+                'room_number': str(room_number),
+                'event_name': str(event_name),
+                'reason': 'Missing required fields'
+            })
+            continue
+
+        if (building_name, room_number) not in valid_rooms:
+            invalid_events.append({
+                'building_name': building_name,
+                'room_number': room_number,
+                'event_name': event_name,
+                'reason': 'Room not in database'
+            })
+            continue
+
+        try:
+            start_time_str = start_time.isoformat()
+            end_time_str = end_time.isoformat()
+        except (ValueError, AttributeError) as e:
+            invalid_events.append({
+                'building_name': building_name,
+                'room_number': room_number,
+                'event_name': event_name,
+                'reason': f'Timestamp conversion error: {e}'
+            })
+            continue
+
+        events_to_insert.append({
+            'building_name': str(building_name),
+            'room_number': str(room_number),
+            'event_name': str(event_name),
+            'start_time': start_time_str,
+            'end_time': end_time_str,
+            'occupant': str(occupant) if pd.notna(occupant) else ''
+        })
+    return events_to_insert, invalid_events
+
+
+def best_of(repeat, func, *args):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark daily-events validation")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the synthetic CSV (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per implementation; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    csv_data = synthetic_csv(args.rows)
+    df = read_events(StringIO(csv_data))
+    valid_rooms = {(building, room) for building in BUILDINGS for room in ROOMS}
+    print(f"Synthetic Tableau CSV: {args.rows} rows, {len(df)} with valid timestamps, "
+          f"{len(csv_data) / 1024 / 1024:.1f} MB")
+
+    legacy_seconds, legacy = best_of(args.repeat, legacy_prepare_events, df, valid_rooms)
+    # prepare_events prints each unknown room; keep the table readable
+    stdout, sys.stdout = sys.stdout, StringIO()
+    try:
+        vectorized_seconds, vectorized = best_of(args.repeat, prepare_events, df, valid_rooms)
+    finally:
+        sys.stdout = stdout
+
+    print(f"\n{'Implementation':<16}{'Seconds':>10}{'Rows/s':>12}")
+    for name, seconds in (("iterrows", legacy_seconds), ("vectorized", vectorized_seconds)):
+        print(f"{name:<16}{seconds:>10.3f}{len(df) / seconds:>12.0f}")
+    print(f"{'Speedup':<16}{legacy_seconds / vectorized_seconds:>9.1f}x")
+
+    events, invalid_events = vectorized
+    reasons = pd.Series([event['reason'] for event in invalid_events]).value_counts()
+    print(f"\n{len(events)} events to insert, {len(invalid_events)} invalid:")
+    for reason, count in reasons.items():
+        print(f"  {reason}: {count}")
+
+    if vectorized != legacy:
+        print("\nVectorized output differs from the iterrows output")
+        sys.exit(1)
+    print("\nBoth implementations produced the same events and invalid_events")
+
+
+if __name__ == "__main__":
+    main()
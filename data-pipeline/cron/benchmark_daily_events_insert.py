@@ -0,0 +1,152 @@
+"""Compare one-request and chunked daily_events inserts against a local stand-in.
+
+Starts a PostgREST stand-in on localhost that accepts inserts into any
+table, takes `--base-ms` plus `--row-us` per row to answer, rejects bodies
+over `--max-body-mb` with 413 like Supabase's gateway, and fails
+`--failure-rate` of requests with a 503 before storing anything. A
+Supabase client pointed at it then inserts synthetic daily events as one
+request (how load_to_postgres used to) and with chunked_insert.insert_chunks,
+and the stand-in checks that every row arrived exactly once.
+
+Pass `--url` and `--key` to run the chunked insert against a real PostgREST
+or Supabase instance instead; rows are inserted into `--table`.
+
+Usage: python cron/benchmark_daily_events_insert.py [--rows N] [--workers N] [--chunk-rows N]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from supabase import create_client
+
+from chunked_insert import DEFAULT_MAX_ROWS, DEFAULT_WORKERS, insert_chunks
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if len(body) > server.max_body:
+            self.respond(413, b"Payload Too Large", "text/plain")
+            return
+        rows = json.loads(body)
+        rows = rows if isinstance(rows, list) else [rows]
+        time.sleep(server.base_seconds + server.row_seconds * len(rows))
+        with server.lock:
+            fail = server.random.random() < server.failure_rate
+            if not fail:
+                server.rows.extend(json.dumps(row, sort_keys=True) for row in rows)
+        if fail:
+            self.respond(503, b"Service Unavailable", "text/plain")
+        else:
+            self.respond(201, b"[]", "application/json")
+
+    def respond(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(args):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.max_body = int(args.max_body_mb * 1024 * 1024)
+    server.base_seconds = args.base_ms / 1000
+    server.row_seconds = args.row_us / 1_000_000
+    server.failure_rate = args.failure_rate
+    server.random = random.Random(0)
+    server.lock = threading.Lock()
+    server.rows = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_events(rows):
+    return [
+        {
+            "building_name": f"Building {i % 60}",
+            "room_number": str(100 + i % 40),
+            "event_name": f"Event {i}",
+            "start_time": f"2025-10-{1 + i % 28:02d}T{7 + i % 12:02d}:00:00-05:00",
+            "end_time": f"2025-10-{1 + i % 28:02d}T{8 + i % 12:02d}:20:00-05:00",
+            "occupant": f"Department {i % 90}",
+        }
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked daily_events inserts")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic events to insert (default: 100000)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent chunk requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_MAX_ROWS, help=f"Rows per chunk (default: {DEFAULT_MAX_ROWS})")
+    parser.add_argument("--chunk-seconds", type=float, default=0,
+                        help="Also insert with chunks sized adaptively to take about this long (default: off)")
+    parser.add_argument("--max-chunk-rows", type=int, default=5000, help="Row cap of adaptive chunks (default: 5000)")
+    parser.add_argument("--base-ms", type=float, default=40, help="Stand-in latency per request (default: 40)")
+    parser.add_argument("--row-us", type=float, default=30, help="Stand-in latency per row (default: 30)")
+    parser.add_argument("--max-body-mb", type=float, default=10, help="Stand-in request body limit (default: 10)")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="Fraction of stand-in requests that return 503 (default: 0.05)")
+    parser.add_argument("--url", help="Insert into this PostgREST/Supabase URL instead of the stand-in")
+    parser.add_argument("--key", default="benchmark", help="API key for --url")
+    parser.add_argument("--table", default="daily_events", help="Table to insert into (default: daily_events)")
+    args = parser.parse_args()
+
+    events = synthetic_events(args.rows)
+    server = None if args.url else start_stand_in(args)
+    url = args.url or f"http://127.0.0.1:{server.server_address[1]}"
+    supabase = create_client(url, args.key)
+
+    def send(chunk):
+        supabase.table(args.table).insert(chunk).execute()
+
+    if server:
+        print(
+            f"Stand-in: {args.base_ms:.0f}ms + {args.row_us:.0f}us/row per request, "
+            f"{args.max_body_mb:.0f} MB body limit, {args.failure_rate:.0%} 503s"
+        )
+        server.failure_rate = 0
+        single = insert_chunks(send, events, args.table, max_rows=len(events),
+                               max_bytes=sys.maxsize, workers=1, attempts=1)
+        single.print_summary("Single request")
+        server.rows.clear()
+        server.failure_rate = args.failure_rate
+
+    runs = [(f"Chunked ({args.chunk_rows} rows, {args.workers} workers)",
+             dict(max_rows=args.chunk_rows))]
+    if args.chunk_seconds:
+        runs.append((f"Adaptive ({args.chunk_seconds}s target, {args.workers} workers)",
+                     dict(max_rows=args.max_chunk_rows, target_seconds=args.chunk_seconds)))
+
+    expected = sorted(json.dumps(event, sort_keys=True) for event in events)
+    failed = False
+    for label, options in runs:
+        report = insert_chunks(send, events, args.table, workers=args.workers, **options)
+        report.print_summary(label)
+        failed = failed or bool(report.failed_chunks)
+        if server:
+            if report.failed_chunks or sorted(server.rows) != expected:
+                print(f"Stand-in received {len(server.rows)} rows, expected each of {len(events)} once")
+                failed = True
+            else:
+                print(f"Stand-in received all {len(events)} rows exactly once")
+            server.rows.clear()
+
+    if server:
+        server.shutdown()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
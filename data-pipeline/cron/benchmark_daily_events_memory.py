@@ -0,0 +1,111 @@
+"""Compare peak memory of buffered and streamed Tableau CSV ingestion.
+
+Serves a synthetic multi-week Tableau DailyEvents export from a local HTTP
+server and ingests it in a fresh process per mode, so peak RSS is measured
+independently:
+
+  baseline  interpreter and imports only, subtracted from the others
+  buffered  response.text wrapped in StringIO and parsed by one read_csv
+            (how get_events_df read the export before streaming)
+  stream    get_events_df: the body parsed in chunks while it downloads
+
+Usage: python cron/benchmark_daily_events_memory.py [--rows N] [--chunksize N]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from curl_cffi import requests
+
+from benchmark_daily_events import synthetic_csv
+from tableau_dailyevents_scraper import EVENTS_CHUNK_ROWS, get_events_df, process_events
+
+MODES = ("baseline", "buffered", "stream")
+GENERATE = "generate"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def run_mode(mode, url, output, chunksize, rows):
+    df = None
+    if mode == GENERATE:
+        Path(output).write_text(synthetic_csv(rows))
+        return 0
+    if mode == "buffered":
+        csv_data = requests.get(url).text
+        df = process_events(pd.read_csv(StringIO(csv_data)))
+    elif mode == "stream":
+        df = get_events_df(url, chunksize)
+    if df is not None:
+        df.to_pickle(output)
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak RSS of Tableau CSV ingestion")
+    parser.add_argument("--rows", type=int, default=500_000, help="Rows in the synthetic export (default: 500000)")
+    parser.add_argument("--chunksize", type=int, default=EVENTS_CHUNK_ROWS,
+                        help=f"Rows parsed at once when streaming (default: {EVENTS_CHUNK_ROWS})")
+    parser.add_argument("--mode", choices=(*MODES, GENERATE), help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(run_mode(args.mode, args.url, args.output, args.chunksize, args.rows))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "DailyEvents.csv"
+        # Generated in a child process: Linux carries the peak RSS of the
+        # parent over to the children it starts
+        subprocess.check_call([
+            sys.executable, __file__, "--mode", GENERATE, "--output", str(export), "--rows", str(args.rows),
+        ], stdout=subprocess.DEVNULL)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=tmp))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/{export.name}"
+        print(f"Synthetic export: {args.rows} rows, {export.stat().st_size / 1024 / 1024:.1f} MB")
+
+        print(f"\n{'Mode':<10}{'Peak RSS MB':>13}{'Above idle':>12}{'Seconds':>10}")
+        results = {}
+        for mode in MODES:
+            output = Path(tmp) / f"{mode}.pkl"
+            start = time.perf_counter()
+            peak = float(subprocess.check_output([
+                sys.executable, __file__, "--mode", mode, "--url", url, "--output", str(output),
+                "--chunksize", str(args.chunksize),
+            ], text=True).strip().splitlines()[-1])
+            elapsed = time.perf_counter() - start
+            results[mode] = output
+            if mode == "baseline":
+                idle = peak
+            print(f"{mode:<10}{peak:>13.1f}{peak - idle:>12.1f}{elapsed:>10.2f}")
+        server.shutdown()
+
+        buffered = pd.read_pickle(results["buffered"]).reset_index(drop=True)
+        streamed = pd.read_pickle(results["stream"])
+        # The buffered read infers Room as integers; compare as text
+        if not buffered.astype(str).equals(streamed.astype(str)):
+            print("\nStreamed events differ from buffered events")
+            sys.exit(1)
+    print("\nBoth modes produced the same events")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
+import argparse
+import io
 import os
 import random
 import time
-from io import StringIO
 from dotenv import load_dotenv, find_dotenv
 from supabase.client import create_client
+import numpy as np
 import pandas as pd
 from curl_cffi import requests
 from utils.buildingnames import alias_map
 from sentry_monitor import emit_gauges
+from chunked_insert import insert_chunks
 
 
 TABLEAU_CSV_URL = "https://tableau.admin.uillinois.edu/views/DailyEventSummary/DailyEvents.csv"
@@ -15,6 +18,20 @@ TABLEAU_REQUEST_ATTEMPTS = 10
 TABLEAU_REQUEST_TIMEOUT = 60
 TABLEAU_RETRY_BACKOFF_SECONDS = 5
 TABLEAU_RETRY_MAX_BACKOFF_SECONDS = 240
+EVENTS_CHUNK_ROWS = 20_000
+EVENTS_CSV_DTYPES = {
+    "Building": str,
+    "Customer": str,
+    "CustomerContact": str,
+    "EventName": str,
+    "Room": str,
+    "StartDate": str,
+    "StartTime": str,
+    "EndTime": str,
+}
+INSERT_CHUNK_ROWS = 1000
+INSERT_WORKERS = 4
+LOAD_MODES = ("sync", "replace")
 
 
 def get_supabase_client():
@@ -36,54 +53,36 @@ def get_supabase_client():
     return create_client(supabase_url, supabase_key)
 
 
-def get_events_df():
-    """Fetch events data from a Tableau dashboard and processes it into a pandas DataFrame.
+def localize_event_times(df):
+    """Attach the America/Chicago time zone to start_time and end_time.
 
-    Returns:
-        DataFrame: Pandas DataFrame representing all events found in the Tableau
-            dashboard with these columns: start_time, end_time, building, customer,
-            customer_contact, event_name, room.
+    ambiguous='infer' resolves a repeated fall-back hour from the order of
+    the times, so it needs every row of the export in one Series.
     """
+    for column in ("start_time", "end_time"):
+        df[column] = df[column].dt.tz_localize("America/Chicago", ambiguous='infer')
+    return df
 
-    for attempt in range(1, TABLEAU_REQUEST_ATTEMPTS + 1):
-        try:
-            response = requests.get(
-                TABLEAU_CSV_URL,
-                impersonate="chrome124",
-                timeout=TABLEAU_REQUEST_TIMEOUT,
-            )
-            response.raise_for_status()
-            csv_data = response.text
-            break
-        except requests.exceptions.RequestException as exc:
-            if attempt == TABLEAU_REQUEST_ATTEMPTS:
-                raise RuntimeError(
-                    f"Unable to fetch Tableau daily events after "
-                    f"{TABLEAU_REQUEST_ATTEMPTS} attempts"
-                ) from exc
 
-            delay = min(
-                TABLEAU_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)),
-                TABLEAU_RETRY_MAX_BACKOFF_SECONDS,
-            )
-            sleep_for = random.uniform(delay / 2, delay)
-            print(
-                f"Tableau request failed (attempt {attempt}/"
-                f"{TABLEAU_REQUEST_ATTEMPTS}): {exc}. "
-                f"Retrying in {sleep_for:.0f} seconds"
-            )
-            time.sleep(sleep_for)
+def process_events(df, localize=True):
+    """Parse timestamps and normalize the columns of a raw Tableau events frame.
 
-    print("Fetched data from Tableau")
+    Args:
+        df (DataFrame): Events as read from the Tableau CSV export.
+        localize (bool): Attach the time zone. Chunks of an export leave it
+            to localize_event_times on the whole frame.
 
-    df = pd.read_csv(StringIO(csv_data))
+    Returns:
+        DataFrame: Events with these columns: start_time, end_time,
+            building_name, occupant, event_name, room_number.
+    """
 
     # Fix EndTime column, delete old one
     df["end_time"] = pd.to_datetime(
         df["EndTime"],
         format="%m/%d/%Y %I:%M:%S %p",
         errors='coerce'  # Convert invalid dates to NaT
-    ).dt.tz_localize("America/Chicago", ambiguous='infer')
+    )
     df = df.drop("EndTime", axis=1)
     df = df.drop("Measure Values", axis=1)
     df = df.drop("Open/Close", axis=1)
@@ -95,16 +94,16 @@ def get_events_df():
         df["StartDate"].astype(str) + " " + df["StartTime"].map(lambda s: s.split(" ", 1)[1] if isinstance(s, str) and " " in s else s),
         format="%m/%d/%Y %I:%M:%S %p",
         errors='coerce'  # Convert invalid dates to NaT
-    ).dt.tz_localize("America/Chicago", ambiguous='infer')
+    )
 
     # Remove rows with invalid timestamps
     initial_count = len(df)
     df = df.dropna(subset=['start_time', 'end_time'])
     dropped_count = initial_count - len(df)
-    if dropped_count > 0:
-        print(f"Dropped {dropped_count} rows with invalid timestamps")
 
     df = df.drop(columns=["StartDate", "StartTime"])
+    if localize:
+        df = localize_event_times(df)
 
     df = df.rename(
         columns={
@@ -121,20 +120,254 @@ def get_events_df():
     df.attrs["tableau_rows"] = initial_count
     df.attrs["invalid_timestamp_events"] = dropped_count
 
+    return df
+
+
+class _ResponseBody(io.RawIOBase):
+    """Readable binary file over a streamed curl_cffi response body."""
+
+    def __init__(self, response):
+        self._chunks = response.iter_content()
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def read_events(csv_file, chunksize=EVENTS_CHUNK_ROWS):
+    """Parse a Tableau events CSV `chunksize` rows at a time.
+
+    Args:
+        csv_file: Path or file object of the CSV export.
+        chunksize (int): Rows parsed and processed at once.
+
+    Returns:
+        DataFrame: The processed chunks concatenated, as from process_events.
+    """
+    chunks = []
+    tableau_rows = 0
+    invalid_timestamp_events = 0
+    # Text columns are read as str so every chunk gets the same dtypes
+    # whatever values it happens to contain
+    with pd.read_csv(csv_file, dtype=EVENTS_CSV_DTYPES, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = process_events(chunk, localize=False)
+            tableau_rows += chunk.attrs["tableau_rows"]
+            invalid_timestamp_events += chunk.attrs["invalid_timestamp_events"]
+            chunks.append(chunk)
+
+    # Localized only now: a repeated fall-back time can span two chunks
+    df = localize_event_times(pd.concat(chunks, ignore_index=True))
+    if invalid_timestamp_events > 0:
+        print(f"Dropped {invalid_timestamp_events} rows with invalid timestamps")
+    df.attrs["tableau_rows"] = tableau_rows
+    df.attrs["invalid_timestamp_events"] = invalid_timestamp_events
+    return df
+
+
+def get_events_df(url=TABLEAU_CSV_URL, chunksize=EVENTS_CHUNK_ROWS):
+    """Fetch events data from a Tableau dashboard and processes it into a pandas DataFrame.
+
+    The CSV is parsed while it downloads, so the raw export is never held
+    in memory as a whole; only the processed rows are kept.
+
+    Returns:
+        DataFrame: Pandas DataFrame representing all events found in the Tableau
+            dashboard with these columns: start_time, end_time, building_name,
+            occupant, event_name, room_number.
+
+    Raises:
+        RuntimeError: If every request attempt fails.
+    """
+
+    for attempt in range(1, TABLEAU_REQUEST_ATTEMPTS + 1):
+        try:
+            response = requests.get(
+                url,
+                impersonate="chrome124",
+                timeout=TABLEAU_REQUEST_TIMEOUT,
+                stream=True,
+            )
+            try:
+                response.raise_for_status()
+                df = read_events(io.BufferedReader(_ResponseBody(response)), chunksize)
+            finally:
+                response.close()
+            break
+        except requests.exceptions.RequestException as exc:
+            if attempt == TABLEAU_REQUEST_ATTEMPTS:
+                raise RuntimeError(
+                    f"Unable to fetch Tableau daily events after "
+                    f"{TABLEAU_REQUEST_ATTEMPTS} attempts"
+                ) from exc
+
+            delay = min(
+                TABLEAU_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)),
+                TABLEAU_RETRY_MAX_BACKOFF_SECONDS,
+            )
+            sleep_for = random.uniform(delay / 2, delay)
+            print(
+                f"Tableau request failed (attempt {attempt}/"
+                f"{TABLEAU_REQUEST_ATTEMPTS}): {exc}. "
+                f"Retrying in {sleep_for:.0f} seconds"
+            )
+            time.sleep(sleep_for)
+
+    print("Fetched data from Tableau")
     print("Finished processing data")
 
     return df
 
 
-def load_to_postgres(df):
+def _isoformat(times):
+    """Format a datetime Series like Timestamp.isoformat(), without a per-row call."""
+    if times.dt.tz is None:
+        local = times
+        offsets = None
+    else:
+        local = times.dt.tz_localize(None)
+        offsets = local - times.dt.tz_convert(None)
+
+    text = pd.Series(
+        np.datetime_as_string(local.to_numpy(dtype="datetime64[ns]"), unit="s"),
+        index=times.index,
+    )
+    if offsets is not None:
+        labels = {}
+        for offset in offsets.unique():
+            minutes = int(offset.total_seconds() // 60)
+            sign = "+" if minutes >= 0 else "-"
+            hours, minutes = divmod(abs(minutes), 60)
+            labels[offset] = f"{sign}{hours:02d}:{minutes:02d}"
+        text = text + offsets.map(labels)
+
+    # Whole-second times are all Tableau produces; anything finer is formatted
+    # by pandas, which adds the fractional part
+    fractional = local.dt.microsecond.ne(0) | local.dt.nanosecond.ne(0)
+    if fractional.any():
+        text[fractional] = times[fractional].map(lambda t: t.isoformat())
+    return text
+
+
+def prepare_events(df, valid_rooms):
+    """Validate events and serialize the loadable ones for Supabase.
+
+    Args:
+        df (DataFrame): Events from get_events_df.
+        valid_rooms (set): (building_name, room_number) pairs in the rooms table.
+
+    Returns:
+        tuple: (events_to_insert, invalid_events), lists of dicts in the
+            frame's row order; each invalid event has a `reason`.
+    """
+    columns = ['building_name', 'room_number', 'event_name']
+    reasons = pd.Series(None, index=df.index, dtype=object)
+
+    invalid_timestamp = df['start_time'].isna() | df['end_time'].isna()
+    reasons[invalid_timestamp] = 'Invalid timestamp'
+
+    missing_fields = ~invalid_timestamp & df[columns].isna().any(axis=1)
+    reasons[missing_fields] = 'Missing required fields'
+
+    unchecked = reasons.isna()
+    known_room = pd.MultiIndex.from_arrays(
+        [df['building_name'], df['room_number']]
+    ).isin(list(valid_rooms))
+    unknown_room = unchecked & ~known_room
+    reasons[unknown_room] = 'Room not in database'
+    for (building_name, room_number), count in (
+        df.loc[unknown_room, ['building_name', 'room_number']].value_counts(sort=False).items()
+    ):
+        print(f"Skipping room not in database: {building_name} - {room_number} ({count} events)")
+
+    loadable = df[reasons.isna()]
+    try:
+        start_times = _isoformat(loadable['start_time'])
+        end_times = _isoformat(loadable['end_time'])
+    except (ValueError, AttributeError, TypeError):
+        # Not a datetime column; serialize row by row to find the bad values
+        start_times = pd.Series(None, index=loadable.index, dtype=object)
+        end_times = pd.Series(None, index=loadable.index, dtype=object)
+        for index, start_time, end_time in zip(
+            loadable.index, loadable['start_time'], loadable['end_time']
+        ):
+            try:
+                start_times[index] = start_time.isoformat()
+                end_times[index] = end_time.isoformat()
+            except (ValueError, AttributeError) as e:
+                reasons[index] = f'Timestamp conversion error: {e}'
+        loadable = loadable[reasons[loadable.index].isna()]
+        start_times = start_times[loadable.index]
+        end_times = end_times[loadable.index]
+
+    invalid = df.loc[reasons.notna(), columns].astype(object)
+    invalid.loc[missing_fields[invalid.index]] = invalid.loc[
+        missing_fields[invalid.index]
+    ].astype(str)
+    invalid['reason'] = reasons[invalid.index]
+    invalid_events = invalid.to_dict('records')
+
+    events = {
+        'building_name': loadable['building_name'].astype(str),
+        'room_number': loadable['room_number'].astype(str),
+        'event_name': loadable['event_name'].astype(str),
+        'start_time': start_times,
+        'end_time': end_times,
+        'occupant': loadable['occupant'].astype(str).where(loadable['occupant'].notna(), ''),
+    }
+    # Every value is already a str, so zip the columns instead of paying
+    # to_dict('records')'s per-cell type boxing
+    keys = list(events)
+    events_to_insert = [
+        dict(zip(keys, values))
+        for values in zip(*(column.tolist() for column in events.values()))
+    ]
+    return events_to_insert, invalid_events
+
+
+def sync_events(supabase, events):
+    """Make daily_events match `events` with the update_daily_events function.
+
+    The function diffs the events against the table on (building, room,
+    start, end, name) in one transaction, so unchanged events keep their
+    rows and readers never see an empty table.
+
+    Returns:
+        dict: Counts of added, removed, updated (occupant only) and
+            unchanged events.
+    """
+    counts = supabase.rpc('update_daily_events', {'events_data': events}).execute().data
+    print(
+        f"Synced daily_events: {counts['added']} added, {counts['removed']} removed, "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+    )
+    return counts
+
+
+def load_to_postgres(df, mode="sync"):
     """Loads the events data into a PostgreSQL database.
 
     Args:
         df (DataFrame): Pandas DataFrame containing events data.
+        mode (str): "sync" to apply only the changes through
+            update_daily_events, or "replace" to delete every event and
+            insert them all again.
 
     Returns:
-        dict | bool: Inserted and unloadable event counts, or False when no
-            events were inserted.
+        dict | bool: Loaded and unloadable event counts (plus added, removed
+            and unchanged counts in sync mode), or False when no events
+            were loaded.
     """
     supabase = get_supabase_client()
 
@@ -142,8 +375,28 @@ def load_to_postgres(df):
     result = supabase.table('rooms').select('building_name,room_number').execute()
     valid_rooms = {(room['building_name'], room['room_number']) for room in result.data}
 
-    events_to_insert = []
-    invalid_events = []
+    events_to_insert, invalid_events = prepare_events(df, valid_rooms)
+
+    if invalid_events:
+        print(f"Skipped {len(invalid_events)} invalid events")
+
+    if not events_to_insert:
+        print("No valid events to insert")
+        return False
+
+    if mode == "sync":
+        try:
+            counts = sync_events(supabase, events_to_insert)
+        except Exception as e:
+            print(f"Error syncing events: {str(e)}")
+            return False
+        return {
+            "inserted_events": len(events_to_insert),
+            "unloadable_events": len(invalid_events),
+            "added_events": counts["added"],
+            "removed_events": counts["removed"],
+            "unchanged_events": counts["unchanged"],
+        }
 
     # Clear existing events
     try:
@@ -153,88 +406,33 @@ def load_to_postgres(df):
         print(f"Error clearing existing events: {str(e)}")
         raise
 
-    for index, row in df.iterrows():
-        building_name = row['building_name']
-        room_number = row['room_number']
-        event_name = row['event_name']
-        start_time = row['start_time']
-        end_time = row['end_time']
-        occupant = row['occupant']
-        
-        # Check for missing or invalid data
-        if pd.isna(start_time) or pd.isna(end_time):
-            invalid_events.append({
-                'building_name': building_name,
-                'room_number': room_number,
-                'event_name': event_name,
-                'reason': 'Invalid timestamp'
-            })
-            continue
-            
-        if pd.isna(building_name) or pd.isna(room_number) or pd.isna(event_name):
-            invalid_events.append({
-                'building_name': str(building_name),
-                'room_number': str(room_number),
-                'event_name': str(event_name),
-                'reason': 'Missing required fields'
-            })
-            continue
-        
-        # Check if room exists in database
-        if (building_name, room_number) not in valid_rooms:
-            print(f"Skipping room not in database: {building_name} - {room_number}")
-            invalid_events.append({
-                'building_name': building_name,
-                'room_number': room_number,
-                'event_name': event_name,
-                'reason': 'Room not in database'
-            })
-            continue
-        
-        # Convert pandas timestamps to ISO format strings for Supabase
-        try:
-            start_time_str = start_time.isoformat()
-            end_time_str = end_time.isoformat()
-        except (ValueError, AttributeError) as e:
-            invalid_events.append({
-                'building_name': building_name,
-                'room_number': room_number,
-                'event_name': event_name,
-                'reason': f'Timestamp conversion error: {e}'
-            })
-            continue
-        
-        events_to_insert.append({
-            'building_name': str(building_name),
-            'room_number': str(room_number),
-            'event_name': str(event_name),
-            'start_time': start_time_str,
-            'end_time': end_time_str,
-            'occupant': str(occupant) if pd.notna(occupant) else ''
-        })
-
-    if invalid_events:
-        print(f"Skipped {len(invalid_events)} invalid events")
-
     # Insert events in batches
-    if events_to_insert:
-        try:
-            supabase.table('daily_events').insert(events_to_insert).execute()
-            print(f"Successfully inserted {len(events_to_insert)} events")
-            return {
-                "inserted_events": len(events_to_insert),
-                "unloadable_events": len(invalid_events),
-            }
-        except Exception as e:
-            print(f"Error inserting events: {str(e)}")
-            return False
-    else:
-        print("No valid events to insert")
+    report = insert_chunks(
+        lambda chunk: supabase.table('daily_events').insert(chunk).execute(),
+        events_to_insert,
+        'daily_events',
+        max_rows=INSERT_CHUNK_ROWS,
+        workers=INSERT_WORKERS,
+    )
+    report.print_summary("Inserted daily_events")
+    if report.failed_chunks:
+        print(
+            f"Error inserting events: {report.failed_rows} of "
+            f"{len(events_to_insert)} events were not inserted"
+        )
         return False
+    print(f"Successfully inserted {report.rows} events")
+    return {
+        "inserted_events": report.rows,
+        "unloadable_events": len(invalid_events),
+    }
 
-def main():
+def main(mode="sync"):
     """Main function to scrape daily events and load them to PostgreSQL.
 
+    Args:
+        mode (str): How to load the events; see load_to_postgres.
+
     Returns:
         str: Confirmation message.
     """
@@ -246,7 +444,7 @@ def main():
     
 
     print("Step 2: Load data to PostgreSQL")
-    load_counts = load_to_postgres(events)
+    load_counts = load_to_postgres(events, mode)
     if not load_counts:
         raise RuntimeError("Failed Step 2: No valid events were inserted")
 
@@ -263,19 +461,20 @@ def main():
 
     invalid_timestamp_events = events.attrs.get("invalid_timestamp_events", 0)
     unloadable_events = load_counts["unloadable_events"]
-    emit_gauges(
-        {
-            "pipeline.data.tableau_rows": events.attrs.get("tableau_rows", len(events)),
-            "pipeline.data.valid_timestamp_events": len(events),
-            "pipeline.database.daily_events": load_counts["inserted_events"],
-            "pipeline.data.invalid_timestamp_events": invalid_timestamp_events,
-            "pipeline.data.unloadable_events": unloadable_events,
-            "pipeline.data.skipped_events": (
-                invalid_timestamp_events + unloadable_events
-            ),
-        },
-        {"pipeline": "tableau-daily-events"},
-    )
+    gauges = {
+        "pipeline.data.tableau_rows": events.attrs.get("tableau_rows", len(events)),
+        "pipeline.data.valid_timestamp_events": len(events),
+        "pipeline.database.daily_events": load_counts["inserted_events"],
+        "pipeline.data.invalid_timestamp_events": invalid_timestamp_events,
+        "pipeline.data.unloadable_events": unloadable_events,
+        "pipeline.data.skipped_events": (
+            invalid_timestamp_events + unloadable_events
+        ),
+    }
+    for change in ("added", "removed", "unchanged"):
+        if f"{change}_events" in load_counts:
+            gauges[f"pipeline.load.daily_events_{change}"] = load_counts[f"{change}_events"]
+    emit_gauges(gauges, {"pipeline": "tableau-daily-events"})
 
     print("Job complete!")
 
@@ -283,4 +482,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Load today's Tableau events into daily_events")
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default="sync",
+        help="sync: apply only the changed events atomically (default); "
+        "replace: delete every event and insert them all again",
+    )
+    main(parser.parse_args().mode)
@@ -0,0 +1,293 @@
+"""Targeted HTML parsing for Course Explorer pages.
+
+`parse_html` tokenizes a page with the same `html.parser` tokenizer and the
+same tree-building rules as BeautifulSoup's "html.parser" builder, but only
+materializes the elements a scraper asks for: the first element with a given
+id, or every element with a given tag name. Those subtrees support the small
+part of the BeautifulSoup API the scrapers use (`find`, `find_all`,
+`select`, `select_one`, `find_next_sibling`, `get_text`, `text`), so the
+same scraping code yields identical results at a fraction of the cost.
+"""
+
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+
+from bs4.dammit import EntitySubstitution
+
+# Mirrors bs4.builder.HTMLTreeBuilder
+EMPTY_ELEMENT_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+}
+STRING_CONTAINER_TAGS = {'rt', 'rp', 'style', 'script', 'template'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+DOCUMENT_NAME = '[document]'
+
+
+class Element:
+    """A parsed element with its child elements and strings.
+
+    Plain text is stored as `str`. Like BeautifulSoup's string subclasses,
+    CDATA and text inside string-container tags (script, style, ...) are
+    stored as `(kind, text)` pairs so `get_text` can tell them apart.
+    """
+    __slots__ = ('name', 'attrs', 'contents', 'parent')
+
+    def __init__(self, name: str, attrs: dict, parent: Optional['Element'] = None):
+        self.name = name
+        self.attrs = attrs
+        self.contents: list = []
+        self.parent = parent
+
+    def __repr__(self):
+        return f"<Element {self.name} {self.attrs}>"
+
+    def _descendants(self) -> Iterator['Element']:
+        stack = [iter(self.contents)]
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, Element):
+                    yield child
+                    stack.append(iter(child.contents))
+                    break
+            else:
+                stack.pop()
+
+    def _strings(self) -> Iterator[str]:
+        # A string-container tag only yields its own kind of string; other
+        # tags yield plain text and CDATA
+        container_kind = self.name if self.name in STRING_CONTAINER_TAGS else None
+        stack = [iter(self.contents)]
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, Element):
+                    stack.append(iter(child.contents))
+                    break
+                if isinstance(child, str):
+                    if container_kind is None:
+                        yield child
+                elif child[0] == container_kind or (container_kind is None and child[0] == 'cdata'):
+                    yield child[1]
+            else:
+                stack.pop()
+
+    def find_all(self, name: str, recursive: bool = True) -> List['Element']:
+        if not recursive:
+            return [child for child in self.contents if isinstance(child, Element) and child.name == name]
+        return [element for element in self._descendants() if element.name == name]
+
+    def find(self, name: str) -> Optional['Element']:
+        for element in self._descendants():
+            if element.name == name:
+                return element
+        return None
+
+    def select(self, selector: str) -> List['Element']:
+        """Match descendants against a single `.class` or `#id` selector."""
+        if selector.startswith('.'):
+            class_name = selector[1:]
+            return [
+                element for element in self._descendants()
+                if class_name in element.attrs.get('class', '').split()
+            ]
+        if selector.startswith('#'):
+            element_id = selector[1:]
+            return [element for element in self._descendants() if element.attrs.get('id') == element_id]
+        raise ValueError(f"Unsupported selector: {selector}")
+
+    def select_one(self, selector: str) -> Optional['Element']:
+        matches = self.select(selector)
+        return matches[0] if matches else None
+
+    def find_next_sibling(self, name: str) -> Optional['Element']:
+        if self.parent is None:
+            return None
+        siblings = self.parent.contents
+        for sibling in siblings[siblings.index(self) + 1:]:
+            if isinstance(sibling, Element) and sibling.name == name:
+                return sibling
+        return None
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        if not strip:
+            return separator.join(self._strings())
+        return separator.join(s for s in (s.strip() for s in self._strings()) if s)
+
+    text = property(get_text)
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _TargetedTreeBuilder(HTMLParser):
+    """html.parser handler that applies BeautifulSoup's tree-building rules.
+
+    Every open element is tracked by name so unbalanced markup nests exactly
+    as it would in BeautifulSoup, but `Element` objects and strings are only
+    kept inside the requested subtrees.
+    """
+
+    def __init__(self, target_id: Optional[str], target_tag: Optional[str]):
+        super().__init__(convert_charrefs=False)
+        self.target_id = target_id
+        self.target_tag = target_tag
+        self.root = Element(DOCUMENT_NAME, {})
+        self.names: List[str] = [DOCUMENT_NAME]
+        self.nodes: List[Optional[Element]] = [None]
+        self.open_counts: dict = {}
+        self.containers: List[str] = []
+        self.preserve_depth = 0
+        self.already_closed_empty_element: List[str] = []
+        self.data: List[str] = []
+        self.target_element: Optional[Element] = None
+
+    def _end_data(self, cdata: bool = False):
+        if not self.data:
+            return
+        data = ''.join(self.data)
+        self.data = []
+        node = self.nodes[-1]
+        if node is None:
+            return
+        if not self.preserve_depth and all(char in ASCII_SPACES for char in data):
+            data = '\n' if '\n' in data else ' '
+        if cdata:
+            node.contents.append(('cdata', data))
+        elif self.containers:
+            node.contents.append((self.containers[-1], data))
+        else:
+            node.contents.append(data)
+
+    def _push(self, name: str, attrs: list):
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = '' if value is None else value
+
+        parent = self.nodes[-1]
+        if parent is not None:
+            node = Element(name, attr_dict, parent)
+            parent.contents.append(node)
+        elif self.target_tag is not None and name == self.target_tag:
+            node = Element(name, attr_dict, self.root)
+            self.root.contents.append(node)
+        elif (self.target_id is not None and self.target_element is None
+              and attr_dict.get('id') == self.target_id):
+            node = Element(name, attr_dict, self.root)
+            self.root.contents.append(node)
+            self.target_element = node
+        else:
+            node = None
+
+        self.names.append(name)
+        self.nodes.append(node)
+        self.open_counts[name] = self.open_counts.get(name, 0) + 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        if name in STRING_CONTAINER_TAGS:
+            self.containers.append(name)
+
+    def _pop(self):
+        name = self.names.pop()
+        node = self.nodes.pop()
+        self.open_counts[name] -= 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+        if name in STRING_CONTAINER_TAGS:
+            self.containers.pop()
+        if node is not None and node is self.target_element:
+            # Nothing later in the document can change a closed element
+            raise _StopParsing()
+
+    def _pop_to_tag(self, name: str):
+        if name == DOCUMENT_NAME:
+            return
+        for i in range(len(self.names) - 1, 0, -1):
+            if not self.open_counts.get(name):
+                break
+            if self.names[i] == name:
+                self._pop()
+                break
+            self._pop()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._end_data()
+        self._push(tag, attrs)
+        if tag in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_empty_element.append(tag)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_empty_element:
+            self.already_closed_empty_element.remove(tag)
+        else:
+            self._end_data()
+            self._pop_to_tag(tag)
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith('x'):
+            real_name = int(name.lstrip('x'), 16)
+        elif name.startswith('X'):
+            real_name = int(name.lstrip('X'), 16)
+        else:
+            real_name = int(name)
+
+        data = None
+        if real_name < 256:
+            # Numeric references below 256 are often meant as Windows-1252
+            try:
+                data = bytearray([real_name]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(real_name)
+            except (ValueError, OverflowError):
+                pass
+        self.data.append(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.data.append(character if character is not None else f'&{name}')
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith('CDATA['):
+            self.data.append(data[len('CDATA['):])
+            self._end_data(cdata=True)
+
+    def handle_pi(self, data):
+        self._end_data()
+
+
+def parse_html(html_content: str, target_id: Optional[str] = None,
+               target_tag: Optional[str] = None) -> Element:
+    """Parse the subtrees of `html_content` selected by id or tag name.
+
+    Returns a document element whose children are the first element with id
+    `target_id` and/or every outermost element named `target_tag`. Parsing
+    stops as soon as the `target_id` element is closed.
+    """
+    builder = _TargetedTreeBuilder(target_id, target_tag)
+    try:
+        builder.feed(html_content)
+        builder.close()
+        builder._end_data()
+    except _StopParsing:
+        pass
+    return builder.root
@@ -1,13 +1,14 @@
 from pathlib import Path
-import json
 from typing import Dict, Any
 
+from stage_io import load_stage, save_stage
+
 
 class BuildingDataFilter:
     def __init__(self):
         self.data_dir = Path(__file__).parent / "data"
-        self.input_file = self.data_dir / "buildings_derived.json"
-        self.output_file = self.data_dir / "buildings_filtered.json"
+        self.input_name = "buildings_derived"
+        self.output_name = "buildings_filtered"
         self.excluded_buildings = {
             "Temple Hoyne Buell Hall",
             "Krannert Center for Perf Arts",
@@ -26,12 +27,10 @@ class BuildingDataFilter:
         self.min_rooms = 5
 
     def load_data(self) -> Dict[str, Any]:
-        with open(self.input_file, "r") as f:
-            return json.load(f)
+        return load_stage(self.data_dir, self.input_name)
 
     def save_data(self, data: Dict[str, Any]) -> None:
-        with open(self.output_file, "w") as f:
-            json.dump(data, f, indent=2)
+        save_stage(data, self.data_dir, self.output_name)
 
     def filter_buildings(self, data: Dict[str, Any]) -> Dict[str, Any]:
         filtered_data = {"last_updated": data["last_updated"], "buildings": {}}
@@ -47,6 +46,7 @@ class BuildingDataFilter:
                 filtered_data["buildings"][building] = building_data
                 print(f"Added {building} to filtered data")
 
+        print(f"\nTotal buildings in filtered file: {len(filtered_data['buildings'])}")
         return filtered_data
 
     def process(self) -> None:
@@ -56,8 +56,6 @@ class BuildingDataFilter:
 
         self.save_data(filtered_data)
 
-        print(f"\nTotal buildings in filtered file: {len(filtered_data['buildings'])}")
-
 
 def main():
     filter_processor = BuildingDataFilter()
@@ -1,11 +1,24 @@
 from pathlib import Path
 from supabase import create_client
 import json
-from typing import List, Dict, Set
+import argparse
+from typing import List, Dict, Optional, Set
 from datetime import datetime
 import os
 from dotenv import load_dotenv, find_dotenv
+from chunked_insert import insert_chunks
+from copy_loader import CopyUnavailable, copy_class_schedule
+from schedule_diff import diff_schedules, fetch_schedule_rows
+from load_verification import (
+    DEFAULT_VERIFY_MODE,
+    VERIFY_MODES,
+    DataValidationError,
+    LoadVerifier,
+    rows_affected,
+)
+from postgrest.types import CountMethod, ReturnMethod
 from sentry_monitor import emit_gauges
+from stage_io import load_stage
 
 load_dotenv(find_dotenv(".env.local"))
 
@@ -15,12 +28,25 @@ if not supabase_url or not supabase_key:
     raise ValueError("Supabase URL and SUPABASE_SECRET_KEY must be set in .env.local")
 
 supabase = create_client(supabase_url, supabase_key)
+# Direct Postgres connection string, only needed by the copy backend
+database_url = os.getenv("SUPABASE_DB_URL")
 
 CHUNK_SIZE = 1000
-
-
-class DataValidationError(Exception):
-    pass
+# Chunks are sent UPLOAD_WORKERS at a time. With a chunk target, chunk
+# sizes adapt so each request takes about that long, up to MAX_CHUNK_ROWS
+# rows and chunked_insert's 1 MB payload bound; without one (0), chunks
+# are CHUNK_SIZE rows as before
+UPLOAD_WORKERS = 4
+CHUNK_TARGET_SECONDS = 2.0
+MAX_CHUNK_ROWS = 5000
+LOAD_BACKENDS = ("rest", "copy")
+SCHEDULE_MODES = ("replace", "diff")
+# Replaced tables are loaded into these and swapped in by
+# promote_schedule_load, so readers never see a partial load
+SHADOW_TABLES = {
+    "class_schedule": "class_schedule_shadow",
+    "academic_terms": "academic_terms_shadow",
+}
 
 
 def validate_json_structure(json_data: Dict) -> None:
@@ -176,121 +202,140 @@ def verify_data_counts(
         )
 
 
-def bulk_insert(table_name: str, records: List[Dict], upsert: bool = False) -> Set:
-    inserted_ids = set()
-    failed_chunks = []
-
-    for i in range(0, len(records), CHUNK_SIZE):
-        chunk = records[i : i + CHUNK_SIZE]
-        chunk_num = i // CHUNK_SIZE + 1
-        total_chunks = (len(records) + CHUNK_SIZE - 1) // CHUNK_SIZE
-
-        try:
-            if upsert:
-                response = supabase.table(table_name).upsert(chunk).execute()
-                print(
-                    f"Processed (upsert) chunk {chunk_num}/{total_chunks} for {table_name}"
-                )
-            else:
-                response = supabase.table(table_name).insert(chunk).execute()
-                print(f"Inserted chunk {chunk_num}/{total_chunks} into {table_name}")
-
-            current_count = (
-                supabase.table(table_name).select("*", count="exact").execute().count
-            )
-            print(f"Current total count in {table_name} after chunk: {current_count}")
-
-            for record in chunk:
-                if table_name == "buildings":
-                    key = record["name"]
-                elif table_name == "rooms":
-                    key = f"{record['building_name']}_{record['room_number']}"
-                elif table_name == "academic_terms":
-                    key = f"{record['academic_year']}_{record['term']}_{record['start_date']}_{record['end_date']}"
-                else:  # class_schedule
-                    key = f"{record['building_name']}_{record['room_number']}_{record['day_of_week']}_{record['start_time']}_{record['start_date']}_{record['end_date']}"
-                inserted_ids.add(key)
-
-        except Exception as e:
-            print(
-                f"Error processing chunk {chunk_num}/{total_chunks} for {table_name} (Operation: {'upsert' if upsert else 'insert'})"
-            )
-            print(f"Error details: {str(e)}")
-            failed_chunks.append((i, chunk))
-
-    if failed_chunks:
-        raise DataValidationError(
-            f"Failed to process {len(failed_chunks)} chunks for {table_name}"
-        )
-
-    final_db_count_for_table = (
-        supabase.table(table_name).select("*", count="exact").execute().count
-    )
-
-    if upsert:
-        print(
-            f"Successfully processed (upserted) {len(records)} records from the current batch for {table_name}. Final table count: {final_db_count_for_table}"
-        )
-    else:
-        # For insert-only (cleared tables), final count should match len(records).
-        if final_db_count_for_table != len(records):
+def record_key(table_name: str, record: Dict) -> str:
+    if table_name == "buildings":
+        return record["name"]
+    if table_name == "rooms":
+        return f"{record['building_name']}_{record['room_number']}"
+    if table_name == "academic_terms":
+        return f"{record['academic_year']}_{record['term']}_{record['start_date']}_{record['end_date']}"
+    # class_schedule
+    return f"{record['building_name']}_{record['room_number']}_{record['day_of_week']}_{record['start_time']}_{record['start_date']}_{record['end_date']}"
+
+
+def bulk_insert(
+    table_name: str,
+    records: List[Dict],
+    verifier: LoadVerifier,
+    upsert: bool = False,
+    target: Optional[str] = None,
+    workers: int = UPLOAD_WORKERS,
+    chunk_seconds: float = CHUNK_TARGET_SECONDS,
+) -> Set:
+    """Write records to `target` (default `table_name`), e.g. its shadow table.
+
+    Chunks are sent `workers` at a time and retried on transient errors by
+    chunked_insert.insert_chunks. A chunk that does not affect exactly its
+    own rows counts as failed; any failed chunk fails the whole load.
+    """
+    target = target or table_name
+
+    def send(chunk: List[Dict]) -> None:
+        # count=exact reports the rows this write affected; no rows are
+        # sent back
+        query = supabase.table(target)
+        if upsert:
+            query = query.upsert(chunk, count=CountMethod.exact, returning=ReturnMethod.minimal)
+        else:
+            query = query.insert(chunk, count=CountMethod.exact, returning=ReturnMethod.minimal)
+        affected = rows_affected(query.execute())
+        if affected != len(chunk):
             raise DataValidationError(
-                f"Final count mismatch in {table_name} (cleared table). Expected: {len(records)}, Got: {final_db_count_for_table}"
+                f"Chunk affected {affected} rows, expected {len(chunk)}"
             )
-        print(
-            f"Successfully inserted and verified {final_db_count_for_table} records in {table_name}"
-        )
-
-    return inserted_ids
 
-
-def verify_database_contents(
-    buildings: List[Dict], rooms: List[Dict], schedules: List[Dict]
-) -> Dict[str, int]:
-    db_buildings_count_response = (
-        supabase.table("buildings").select("*", count="exact").execute()
+    report = insert_chunks(
+        send,
+        records,
+        target,
+        max_rows=MAX_CHUNK_ROWS if chunk_seconds else CHUNK_SIZE,
+        workers=workers,
+        target_seconds=chunk_seconds or None,
     )
-    actual_building_count_in_db = db_buildings_count_response.count
-    # For buildings, we expect AT LEAST the number of buildings from the current dataset to be present,
-    # as buildings are preserved across loads.
-    if actual_building_count_in_db < len(buildings):
+    report.print_summary(f"{'Upserted' if upsert else 'Inserted'} {target}")
+
+    if report.failed_chunks:
         raise DataValidationError(
-            f"Building count issue in database. Expected at least: {len(buildings)} (from current data), Got: {actual_building_count_in_db}"
+            f"Failed to process {len(report.failed_chunks)} chunks for {table_name}"
         )
-    print(
-        f"Verified buildings count in DB: {actual_building_count_in_db} (current dataset has {len(buildings)} buildings)"
-    )
 
-    db_rooms_count_response = (
-        supabase.table("rooms").select("*", count="exact").execute()
+    # Upserted tables are preserved across loads; inserted ones were
+    # replaced. The savings report compares with the CHUNK_SIZE chunks the
+    # loader used to send
+    verifier.record_load(
+        table_name,
+        records,
+        (len(records) + CHUNK_SIZE - 1) // CHUNK_SIZE,
+        report.rows,
+        replaced=not upsert,
     )
-    actual_room_count_in_db = db_rooms_count_response.count
-    # For rooms, we expect AT LEAST the number of rooms from the current dataset to be present,
-    # as rooms are preserved across loads.
-    if actual_room_count_in_db < len(rooms):
-        raise DataValidationError(
-            f"Room count issue in database. Expected at least: {len(rooms)} (from current data), Got: {actual_room_count_in_db}"
-        )
     print(
-        f"Verified rooms count in DB: {actual_room_count_in_db} (current dataset has {len(rooms)} rooms)"
+        f"Successfully {'processed (upserted)' if upsert else 'inserted'} "
+        f"{len(records)} records in {target} ({report.rows} rows affected)"
     )
 
-    db_schedules_count = (
-        supabase.table("class_schedule").select("*", count="exact").execute()
+    return {record_key(table_name, record) for record in records}
+
+
+def load_class_schedule(
+    schedules: List[Dict],
+    verifier: LoadVerifier,
+    backend: str = "rest",
+    workers: int = UPLOAD_WORKERS,
+    chunk_seconds: float = CHUNK_TARGET_SECONDS,
+) -> Set:
+    """Load class_schedule's shadow table, over COPY if requested and possible, else REST."""
+    if backend == "copy":
+        try:
+            result = copy_class_schedule(database_url, schedules)
+        except CopyUnavailable as e:
+            print(f"COPY backend unavailable ({e}); falling back to the REST loader")
+        else:
+            # Count the chunks the REST loader would have sent, for the
+            # verification savings report
+            total_chunks = (len(schedules) + CHUNK_SIZE - 1) // CHUNK_SIZE
+            verifier.record_load(
+                "class_schedule", schedules, total_chunks, result.rows, replaced=True
+            )
+            print(
+                f"Copied {result.rows} records into {SHADOW_TABLES['class_schedule']} "
+                f"in {result.seconds:.2f}s"
+            )
+            return {record_key("class_schedule", record) for record in schedules}
+
+    return bulk_insert(
+        "class_schedule",
+        schedules,
+        verifier,
+        target=SHADOW_TABLES["class_schedule"],
+        workers=workers,
+        chunk_seconds=chunk_seconds,
     )
-    schedule_count = db_schedules_count.count
-    if schedule_count != len(schedules):
-        raise DataValidationError(
-            f"Schedule count mismatch in database. Expected: {len(schedules)}, Got: {schedule_count}"
-        )
-    print(f"Verified schedules count: {schedule_count}")
 
-    print("All count verifications passed successfully!")
-    return {
-        "buildings": actual_building_count_in_db,
-        "rooms": actual_room_count_in_db,
-        "class_schedule_rows": schedule_count,
+
+def promote_load(
+    schedules: List[Dict],
+    academic_terms: List[Dict],
+    deleted_schedule_ids: Optional[List[int]] = None,
+) -> None:
+    """Swap the shadow tables into class_schedule and academic_terms atomically.
+
+    With deleted_schedule_ids (a diff load) only those class_schedule rows
+    are deleted and the shadow rows added. promote_schedule_load refuses to
+    swap unless class_schedule would end up with exactly the loaded rows;
+    on any error the previous data stays live.
+    """
+    params = {
+        "expected_schedule_rows": len(schedules),
+        "expected_term_rows": len(academic_terms),
     }
+    if deleted_schedule_ids is not None:
+        params["deleted_schedule_ids"] = deleted_schedule_ids
+    result = supabase.rpc("promote_schedule_load", params).execute()
+    print(
+        f"Promoted {result.data['class_schedule']} class schedules and "
+        f"{result.data['academic_terms']} academic terms"
+    )
 
 
 def clear_table(table_name: str) -> None:
@@ -301,6 +346,8 @@ def clear_table(table_name: str) -> None:
         "rooms": "building_name",
         "class_schedule": "building_name",
         "academic_terms": "academic_year",
+        "class_schedule_shadow": "course_code",
+        "academic_terms_shadow": "academic_year",
     }
 
     try:
@@ -332,14 +379,22 @@ def get_metric_attributes(data_dir: Path) -> Dict[str, object]:
     return attributes
 
 
-def main():
+def main(
+    verify_mode: str = DEFAULT_VERIFY_MODE,
+    backend: str = "rest",
+    schedule_mode: str = "replace",
+    workers: int = UPLOAD_WORKERS,
+    chunk_seconds: float = CHUNK_TARGET_SECONDS,
+):
     try:
+        verifier = LoadVerifier(supabase, verify_mode)
         data_dir = Path(__file__).parent / "data"
-        print("Warning: This script will clear all data in the database.")
+        print(
+            "Warning: This script will replace all class schedules and academic terms in the database."
+        )
         print("Loading and validating JSON data...")
 
-        with open(data_dir / "buildings_enriched.json", "r") as f:
-            json_data = json.load(f)
+        json_data = load_stage(data_dir, "buildings_enriched")
 
         with open(data_dir / "academic_calendar.json", "r") as f:
             academic_terms_data = json.load(f)
@@ -357,40 +412,80 @@ def main():
         verify_data_counts(json_data, buildings, rooms, schedules)
         print("Data preparation validated successfully")
 
-        print("\nClearing existing data...")
-        # Clear tables and verify
-        # 'buildings' and 'rooms' are not cleared to preserve them across updates.
-        # Rooms are upserted. Buildings will also be upserted.
-        tables_to_clear = ["class_schedule", "academic_terms"]
-        for table in tables_to_clear:
+        print("\nClearing shadow tables...")
+        # class_schedule and academic_terms are loaded into their shadow
+        # tables and promoted together at the end; the live tables are never
+        # cleared. 'buildings' and 'rooms' are upserted in place to preserve
+        # them across updates.
+        for table in SHADOW_TABLES.values():
             clear_table(table)
-        print("Relevant tables cleared successfully (buildings and rooms preserved)")
+        print("Shadow tables cleared successfully")
 
         print("\nInserting and verifying data...")
 
-        academic_terms_ids = bulk_insert("academic_terms", academic_terms_data)
+        academic_terms_ids = bulk_insert(
+            "academic_terms",
+            academic_terms_data,
+            verifier,
+            target=SHADOW_TABLES["academic_terms"],
+            workers=workers,
+            chunk_seconds=chunk_seconds,
+        )
         print(f"Inserted {len(academic_terms_ids)} academic terms")
 
-        building_ids = bulk_insert("buildings", buildings, upsert=True)
+        building_ids = bulk_insert(
+            "buildings",
+            buildings,
+            verifier,
+            upsert=True,
+            workers=workers,
+            chunk_seconds=chunk_seconds,
+        )
         print(f"Processed {len(building_ids)} buildings from current data (upserted)")
 
-        room_ids = bulk_insert("rooms", rooms, upsert=True)
+        room_ids = bulk_insert(
+            "rooms", rooms, verifier, upsert=True, workers=workers, chunk_seconds=chunk_seconds
+        )
         print(f"Processed {len(room_ids)} rooms from current data (upserted)")
 
-        schedule_ids = bulk_insert("class_schedule", schedules)
-        print(f"Inserted {len(schedule_ids)} schedules")
+        schedule_diff = None
+        if schedule_mode == "diff":
+            print("\nDiffing class_schedule against the database...")
+            schedule_diff = diff_schedules(fetch_schedule_rows(supabase), schedules)
+            print(
+                f"class_schedule changes: {len(schedule_diff.inserted)} added, "
+                f"{len(schedule_diff.deleted_ids)} removed, "
+                f"{schedule_diff.unchanged} unchanged"
+            )
+            load_class_schedule(
+                schedule_diff.inserted, verifier, backend, workers, chunk_seconds
+            )
+            schedule_ids = {record_key("class_schedule", record) for record in schedules}
+            print(f"Inserted {len(schedule_diff.inserted)} changed schedules")
+        else:
+            schedule_ids = load_class_schedule(
+                schedules, verifier, backend, workers, chunk_seconds
+            )
+            print(f"Inserted {len(schedule_ids)} schedules")
+
+        print("\nPromoting shadow tables...")
+        if schedule_diff:
+            promote_load(schedules, academic_terms_data, schedule_diff.deleted_ids)
+            # Verify the whole table against every record, not just the
+            # ones sent
+            verifier.record_load(
+                "class_schedule",
+                schedules,
+                (len(schedules) + CHUNK_SIZE - 1) // CHUNK_SIZE,
+                len(schedule_diff.inserted),
+                replaced=True,
+                written=len(schedule_diff.inserted),
+            )
+        else:
+            promote_load(schedules, academic_terms_data)
 
         print("\nPerforming final database verification...")
-        database_counts = verify_database_contents(buildings, rooms, schedules)
-
-        db_terms_count = (
-            supabase.table("academic_terms").select("*", count="exact").execute()
-        )
-        if db_terms_count.count != len(academic_terms_data):
-            raise DataValidationError(
-                f"Academic terms count mismatch. Expected: {len(academic_terms_data)}, Got: {db_terms_count.count}"
-            )
-        print(f"Verified academic terms count: {db_terms_count.count}")
+        database_counts = verifier.verify()
 
         print("\nFinal Summary:")
         print(f"Academic terms inserted and verified: {len(academic_terms_ids)}")
@@ -405,21 +500,24 @@ def main():
         supabase.rpc("refresh_room_availability_cache", {}).execute()
         print("Room availability cache refreshed successfully")
 
-        emit_gauges(
-            {
-                "pipeline.database.buildings": database_counts["buildings"],
-                "pipeline.database.rooms": database_counts["rooms"],
-                "pipeline.database.class_schedule_rows": database_counts[
-                    "class_schedule_rows"
-                ],
-                "pipeline.database.academic_terms": db_terms_count.count,
-                "pipeline.load.buildings": len(buildings),
-                "pipeline.load.rooms": len(rooms),
-                "pipeline.load.class_schedule_rows": len(schedules),
-                "pipeline.load.academic_terms": len(academic_terms_data),
-            },
-            get_metric_attributes(data_dir),
-        )
+        gauges = {
+            "pipeline.load.buildings": len(buildings),
+            "pipeline.load.rooms": len(rooms),
+            "pipeline.load.class_schedule_rows": len(schedules),
+            "pipeline.load.academic_terms": len(academic_terms_data),
+        }
+        # Database counts are only read when the load is verified
+        for table_name, gauge in (
+            ("buildings", "pipeline.database.buildings"),
+            ("rooms", "pipeline.database.rooms"),
+            ("class_schedule", "pipeline.database.class_schedule_rows"),
+            ("academic_terms", "pipeline.database.academic_terms"),
+        ):
+            if table_name in database_counts:
+                gauges[gauge] = database_counts[table_name]
+        if schedule_diff:
+            gauges.update(schedule_diff.gauges())
+        emit_gauges(gauges, get_metric_attributes(data_dir))
 
     except DataValidationError as e:
         print(f"\nData Validation Error: {str(e)}")
@@ -430,4 +528,44 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Load building and schedule data into Supabase")
+    parser.add_argument(
+        "--verify",
+        choices=VERIFY_MODES,
+        default=DEFAULT_VERIFY_MODE,
+        help="How to check the tables after loading: none (per-request affected "
+        "rows only), counts (one count per table, default) or checksum (row "
+        "checksums for class_schedule and academic_terms)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=LOAD_BACKENDS,
+        default="rest",
+        help="How to load class_schedule into its shadow table: rest (Supabase "
+        "REST API in chunks, default) or copy (binary COPY over a direct Postgres "
+        "connection from SUPABASE_DB_URL; falls back to rest when the database "
+        "cannot be reached)",
+    )
+    parser.add_argument(
+        "--schedule-mode",
+        choices=SCHEDULE_MODES,
+        default="replace",
+        help="replace (default) rewrites every class_schedule row; diff compares "
+        "the new rows with the database and only adds and removes the changed ones",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=UPLOAD_WORKERS,
+        help=f"Chunks sent to the REST API at a time (default: {UPLOAD_WORKERS}; 1 sends them one by one)",
+    )
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=CHUNK_TARGET_SECONDS,
+        help="Target request time used to size chunks from observed response times "
+        f"and payload sizes (default: {CHUNK_TARGET_SECONDS}); 0 sends fixed "
+        f"{CHUNK_SIZE}-row chunks",
+    )
+    args = parser.parse_args()
+    main(args.verify, args.backend, args.schedule_mode, args.workers, args.chunk_seconds)
@@ -0,0 +1,182 @@
+"""Verify a load_to_postgres.py run with as few round trips as possible.
+
+Every insert and upsert asks PostgREST for the number of rows it affected
+(`Prefer: count=exact` on the write itself, which costs no extra query),
+and LoadVerifier checks those totals against the records sent. At the end
+of the load each table is checked once, depending on the mode:
+
+  none      trust the per-request affected-row counts
+  counts    one `count=exact` HEAD request per table (default)
+  checksum  as counts for the preserved tables (buildings, rooms); for the
+            replaced ones, the row count and an md5 over the canonical rows
+            computed by the load_checksum database function
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+VERIFY_MODES = ("none", "counts", "checksum")
+DEFAULT_VERIFY_MODE = "counts"
+
+# Columns load_checksum hashes per row, in order
+CHECKSUM_COLUMNS = {
+    "class_schedule": [
+        "building_name",
+        "room_number",
+        "course_code",
+        "course_title",
+        "start_time",
+        "end_time",
+        "day_of_week",
+        "start_date",
+        "end_date",
+    ],
+    "academic_terms": ["academic_year", "term", "part_of_term", "start_date", "end_date"],
+}
+# Rendered as HH24:MI by load_checksum
+TIME_COLUMNS = {"start_time", "end_time"}
+
+
+class DataValidationError(Exception):
+    pass
+
+
+def rows_affected(response) -> int:
+    """Rows a write affected, from its Content-Range count."""
+    return response.count if response.count is not None else len(response.data or [])
+
+
+def checksum_row(table_name: str, record: Dict) -> str:
+    values = []
+    for column in CHECKSUM_COLUMNS[table_name]:
+        value = record.get(column)
+        if value is None:
+            # concat_ws skips NULLs
+            continue
+        value = str(value)
+        values.append(value[:5] if column in TIME_COLUMNS else value)
+    return "\t".join(values)
+
+
+def records_checksum(table_name: str, records: List[Dict]) -> str:
+    """md5 of the records' canonical rows, as load_checksum computes it."""
+    # Python orders str by code point, the same order as Postgres' "C"
+    # collation on UTF-8
+    rows = sorted(checksum_row(table_name, record) for record in records)
+    return hashlib.md5("\n".join(rows).encode()).hexdigest()
+
+
+@dataclass
+class TableLoad:
+    records: List[Dict]
+    chunks: int
+    rows_affected: int
+    # Cleared before the load, so the table must hold exactly `records`;
+    # preserved tables must hold at least as many rows
+    replaced: bool
+
+
+class LoadVerifier:
+    def __init__(self, supabase, mode: str = DEFAULT_VERIFY_MODE):
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Invalid verify mode: {mode}. Must be one of: {VERIFY_MODES}")
+        self.supabase = supabase
+        self.mode = mode
+        self.loads: Dict[str, TableLoad] = {}
+        self.query_seconds: Dict[str, float] = {}
+        # Latency of the count queries, to estimate what the skipped ones cost
+        self.count_seconds: Dict[str, float] = {}
+
+    def record_load(
+        self,
+        table_name: str,
+        records: List[Dict],
+        chunks: int,
+        affected: int,
+        replaced: bool,
+        written: Optional[int] = None,
+    ) -> None:
+        """`written` is how many of the records were sent, when a diff load
+        only sent the changed ones; all of them by default."""
+        written = len(records) if written is None else written
+        if affected != written:
+            raise DataValidationError(
+                f"{table_name} writes affected {affected} rows, expected {written}"
+            )
+        self.loads[table_name] = TableLoad(records, chunks, affected, replaced)
+
+    def _timed(self, table_name: str, query):
+        started_at = time.monotonic()
+        result = query.execute()
+        self.query_seconds[table_name] = time.monotonic() - started_at
+        return result
+
+    def _check_count(self, table_name: str, load: TableLoad) -> int:
+        count = self._timed(
+            table_name, self.supabase.table(table_name).select("*", count="exact", head=True)
+        ).count
+        self.count_seconds[table_name] = self.query_seconds[table_name]
+        expected = len(load.records)
+        if load.replaced and count != expected:
+            raise DataValidationError(
+                f"{table_name} count mismatch in database. Expected: {expected}, Got: {count}"
+            )
+        if not load.replaced and count < expected:
+            raise DataValidationError(
+                f"{table_name} count issue in database. Expected at least: {expected} "
+                f"(from current data), Got: {count}"
+            )
+        print(f"Verified {table_name} count in DB: {count} (current dataset has {expected})")
+        return count
+
+    def _check_checksum(self, table_name: str, load: TableLoad) -> int:
+        result = self._timed(
+            table_name, self.supabase.rpc("load_checksum", {"table_name": table_name})
+        ).data
+        expected = records_checksum(table_name, load.records)
+        if result["rows"] != len(load.records) or result["md5"] != expected:
+            raise DataValidationError(
+                f"{table_name} checksum mismatch in database. Expected: "
+                f"{len(load.records)} rows, md5 {expected}; Got: {result['rows']} rows, "
+                f"md5 {result['md5']}"
+            )
+        print(f"Verified {table_name} checksum in DB: {result['rows']} rows, md5 {expected}")
+        return result["rows"]
+
+    def verify(self) -> Dict[str, int]:
+        """Check every loaded table; returns the row counts read from the database."""
+        counts = {}
+        for table_name, load in self.loads.items():
+            if self.mode == "none":
+                print(f"Skipped verifying {table_name} ({load.rows_affected} rows affected)")
+            elif self.mode == "checksum" and load.replaced and table_name in CHECKSUM_COLUMNS:
+                counts[table_name] = self._check_checksum(table_name, load)
+            else:
+                counts[table_name] = self._check_count(table_name, load)
+        self.print_savings()
+        return counts
+
+    def print_savings(self) -> None:
+        """Compare with the count queries the loader used to run.
+
+        That was a full-table count after every chunk and at the end of
+        bulk_insert, plus one more per table in the final verification.
+        """
+        previous = sum(load.chunks + 2 for load in self.loads.values())
+        queries = len(self.query_seconds)
+        seconds: Optional[float] = None
+        if self.count_seconds:
+            # Each skipped count scanned the same table as the count run for
+            # it here; earlier ones saw fewer rows, so this is an upper bound
+            seconds = sum(
+                (self.loads[table_name].chunks + 1) * count_seconds
+                for table_name, count_seconds in self.count_seconds.items()
+            )
+        print(
+            f"Verification ({self.mode}): {queries} queries in "
+            f"{sum(self.query_seconds.values()):.2f}s instead of {previous} count queries; "
+            f"saved {previous - queries} round trips"
+            + (f" and up to {seconds:.1f}s of table scans" if seconds is not None else "")
+        )
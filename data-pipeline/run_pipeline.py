@@ -0,0 +1,262 @@
+"""Run the building transform stages in one process.
+
+Chains subject_to_buildings, filter_buildings, add_building_hours,
+add_building_coordinates and audit_building_metadata on one in-memory
+dataset instead of six processes that each re-read the previous stage's
+file. Only buildings_enriched (read by load_to_postgres.py) and
+buildings.json are written, plus the intermediate stage files with
+--dump-intermediates. Each stage is timed and its failure reported like
+`sentry_monitor.py run-stage`.
+
+Each stage's output is cached in data/stage_cache under a key hashed from
+its input files, its code and the key of the stage before it. Stages whose
+key is unchanged since an earlier run are skipped and the first stage that
+has to run starts from the cached output; --force runs every stage.
+
+Usage: python run_pipeline.py [--monitor-slug SLUG] [--dump-intermediates] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from add_building_coordinates import BuildingCoordinateProcessor
+from add_building_hours import BuildingHoursProcessor
+from audit_building_metadata import CANONICAL_FILE, ENRICHED_STAGE, apply_audit
+from filter_buildings import BuildingDataFilter
+from sentry_monitor import github_escape, report_stage_failure
+from stage_io import export_json, load_stage, save_stage, stage_file, stage_format
+from subject_to_buildings import SubjectToBuildingsProcessor
+
+PIPELINE_DIR = Path(__file__).parent
+DATA_DIR = PIPELINE_DIR / "data"
+CACHE_DIR = DATA_DIR / "stage_cache"
+CACHE_FORMAT = "msgpack"
+# Key and output hashes of the last run that wrote the final outputs
+OUTPUTS_MANIFEST = CACHE_DIR / "outputs.json"
+FINAL_STAGE = "write-building-data"
+
+
+class Stage(NamedTuple):
+    stage: str
+    label: str
+    run: Callable[[Any], Any]
+    # Stage file the standalone script writes, saved with --dump-intermediates
+    output_name: Optional[str] = None
+    # Files read by the stage besides the previous stage's output
+    inputs: Tuple[Path, ...] = ()
+    # Pipeline modules whose code determines the stage's output
+    sources: Tuple[str, ...] = ()
+
+
+def file_digest(path: Path) -> str:
+    if not path.exists():
+        # The stage itself reports the missing file
+        return "missing"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_keys(stages: List[Stage]) -> List[str]:
+    """Hash each stage's inputs and code, chained through the earlier stages."""
+    keys = []
+    previous = stage_format()
+    for stage in stages:
+        digest = hashlib.sha256(previous.encode())
+        for path in (*stage.inputs, *(PIPELINE_DIR / source for source in stage.sources)):
+            digest.update(f"{path.name}:{file_digest(path)}\n".encode())
+        previous = digest.hexdigest()
+        keys.append(previous)
+    return keys
+
+
+def cache_name(stage: Stage, key: str) -> str:
+    return f"{stage.stage}-{key[:16]}"
+
+
+def final_outputs() -> List[Path]:
+    return [stage_file(DATA_DIR, ENRICHED_STAGE), CANONICAL_FILE]
+
+
+def is_cached(stage: Stage, key: str) -> bool:
+    if stage.stage != FINAL_STAGE:
+        return stage_file(CACHE_DIR, cache_name(stage, key), CACHE_FORMAT).exists()
+    # The final stage's outputs are the data files themselves
+    if not OUTPUTS_MANIFEST.exists():
+        return False
+    with open(OUTPUTS_MANIFEST, "r") as f:
+        manifest = json.load(f)
+    return manifest.get("key") == key and manifest.get("outputs") == {
+        path.name: file_digest(path) for path in final_outputs()
+    }
+
+
+def store_cache(stage: Stage, key: str, data: Any) -> None:
+    CACHE_DIR.mkdir(exist_ok=True)
+    if stage.stage == FINAL_STAGE:
+        with open(OUTPUTS_MANIFEST, "w") as f:
+            json.dump(
+                {"key": key, "outputs": {path.name: file_digest(path) for path in final_outputs()}},
+                f,
+                indent=2,
+            )
+        return
+    current = stage_file(CACHE_DIR, cache_name(stage, key), CACHE_FORMAT)
+    save_stage(data, CACHE_DIR, current.stem, CACHE_FORMAT)
+    for stale in CACHE_DIR.glob(f"{stage.stage}-*.{CACHE_FORMAT}"):
+        if stale != current:
+            stale.unlink()
+
+
+def build_stages() -> List[Stage]:
+    subjects = SubjectToBuildingsProcessor()
+    building_filter = BuildingDataFilter()
+    hours = BuildingHoursProcessor()
+    coordinates = BuildingCoordinateProcessor()
+
+    def write_outputs(building_data):
+        save_stage(building_data, DATA_DIR, ENRICHED_STAGE)
+        export_json(building_data, DATA_DIR, ENRICHED_STAGE, CANONICAL_FILE)
+        return building_data
+
+    return [
+        Stage(
+            "transform-subjects",
+            "Transform subjects into buildings",
+            lambda _: subjects.process_to_buildings(subjects.load_subject_data()),
+            subjects.output_name,
+            inputs=(subjects.input_file,),
+            sources=("subject_to_buildings.py", "subjects_stream.py"),
+        ),
+        Stage(
+            "filter-buildings",
+            "Filter buildings",
+            building_filter.filter_buildings,
+            building_filter.output_name,
+            sources=("filter_buildings.py",),
+        ),
+        Stage(
+            "add-building-hours",
+            "Add building hours",
+            lambda data: hours.add_hours(data, hours.load_hours()),
+            hours.buildings_name,
+            inputs=(hours.hours_file,),
+            sources=("add_building_hours.py",),
+        ),
+        Stage(
+            "add-building-coordinates",
+            "Add building coordinates",
+            lambda data: coordinates.add_coordinates(data, coordinates.load_geojson()),
+            inputs=(coordinates.geojson_file,),
+            sources=("add_building_coordinates.py",),
+        ),
+        Stage(
+            "audit-building-metadata",
+            "Audit building metadata",
+            lambda data: apply_audit(data)[0],
+            sources=("audit_building_metadata.py",),
+        ),
+        Stage(FINAL_STAGE, "Write building data", write_outputs, sources=("stage_io.py",)),
+    ]
+
+
+def run_stages(
+    stages: List[Stage],
+    monitor_slug: Optional[str],
+    dump_intermediates: bool,
+    force: bool = False,
+) -> int:
+    keys = stage_keys(stages)
+    first_to_run = 0
+    if not force:
+        while first_to_run < len(stages) and is_cached(stages[first_to_run], keys[first_to_run]):
+            first_to_run += 1
+
+    data = None
+    durations = []
+    for index, (stage, key) in enumerate(zip(stages, keys)):
+        if index < first_to_run:
+            print(f"Skipped pipeline stage: {stage.label} (inputs and code unchanged)", flush=True)
+            durations.append((stage.label, None))
+            continue
+
+        print(f"Starting pipeline stage: {stage.label}", flush=True)
+        started_at = time.monotonic()
+        try:
+            if index == first_to_run and index > 0:
+                # Resume from the last skipped stage's cached output
+                data = load_stage(CACHE_DIR, cache_name(stages[index - 1], keys[index - 1]), CACHE_FORMAT)
+            data = stage.run(data)
+            if dump_intermediates and stage.output_name:
+                save_stage(data, DATA_DIR, stage.output_name)
+            store_cache(stage, key, data)
+        except Exception:
+            traceback.print_exc()
+            duration_seconds = round(time.monotonic() - started_at, 3)
+            message = f"{stage.label} failed after {duration_seconds:.1f}s"
+            print(
+                f"::error title=Pipeline stage failed::{github_escape(message)}",
+                flush=True,
+            )
+            if monitor_slug:
+                report_stage_failure(
+                    argparse.Namespace(
+                        monitor_slug=monitor_slug, stage=stage.stage, label=stage.label
+                    ),
+                    1,
+                    duration_seconds,
+                )
+            return 1
+
+        duration_seconds = round(time.monotonic() - started_at, 3)
+        durations.append((stage.label, duration_seconds))
+        print(
+            f"Completed pipeline stage: {stage.label} ({duration_seconds:.1f}s)",
+            flush=True,
+        )
+
+    print("\nStage timings:")
+    for label, duration_seconds in durations:
+        if duration_seconds is None:
+            print(f"  {label:<36}{'cached':>9}")
+        else:
+            print(f"  {label:<36}{duration_seconds:>8.2f}s")
+    print(f"  {'Total':<36}{sum(d for _, d in durations if d is not None):>8.2f}s")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the building transform stages in one process"
+    )
+    parser.add_argument(
+        "--monitor-slug",
+        default=None,
+        help="Sentry monitor slug to tag stage failures with (omit to skip reporting)",
+    )
+    parser.add_argument(
+        "--dump-intermediates",
+        action="store_true",
+        help="Also write buildings_derived and buildings_filtered for debugging "
+        "(from the stages that run)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every stage even if its inputs and code are unchanged",
+    )
+    args = parser.parse_args()
+    return run_stages(
+        build_stages(), args.monitor_slug, args.dump_intermediates, force=args.force
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
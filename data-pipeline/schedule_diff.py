@@ -0,0 +1,80 @@
+"""Diff the weekly class_schedule load against the rows already loaded.
+
+Mid-term, a weekly scrape changes a handful of sections, yet a full load
+rewrites every row. In diff mode load_to_postgres.py reads the current
+rows (id and content, 1000 per request), pairs them with the new records
+on their content key, and writes only the records without a partner. The
+rows without a partner are deleted by id when promote_schedule_load swaps
+the new ones in.
+
+The key is every loaded column, parsed the way copy_loader sends them, so
+"09:00" and the "09:00:00" PostgREST returns compare equal. The key
+bulk_insert reports (record_key) leaves out the course and end time, and
+would miss a section that only changed title. Identical rows are paired
+one to one, so the table ends up with exactly the loaded records.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+from copy_loader import SCHEDULE_COLUMNS, schedule_row
+
+FETCH_PAGE_SIZE = 1000
+
+
+@dataclass
+class ScheduleDiff:
+    inserted: List[Dict]
+    deleted_ids: List[int]
+    unchanged: int
+
+    def gauges(self) -> Dict[str, int]:
+        return {
+            "pipeline.load.class_schedule_added": len(self.inserted),
+            "pipeline.load.class_schedule_removed": len(self.deleted_ids),
+            "pipeline.load.class_schedule_unchanged": self.unchanged,
+        }
+
+
+def content_key(record: Dict) -> Tuple:
+    return schedule_row(record)
+
+
+def fetch_schedule_rows(supabase) -> Iterator[Dict]:
+    """Yield every class_schedule row, paging on id."""
+    columns = ",".join(["id"] + SCHEDULE_COLUMNS)
+    last_id = 0
+    while True:
+        rows = (
+            supabase.table("class_schedule")
+            .select(columns)
+            .gt("id", last_id)
+            .order("id")
+            .limit(FETCH_PAGE_SIZE)
+            .execute()
+            .data
+        )
+        yield from rows
+        if len(rows) < FETCH_PAGE_SIZE:
+            return
+        last_id = rows[-1]["id"]
+
+
+def diff_schedules(current_rows: Iterator[Dict], schedules: List[Dict]) -> ScheduleDiff:
+    current_ids = defaultdict(list)
+    for row in current_rows:
+        current_ids[content_key(row)].append(row["id"])
+
+    inserted = []
+    unchanged = 0
+    for record in schedules:
+        ids = current_ids.get(content_key(record))
+        if ids:
+            ids.pop()
+            unchanged += 1
+        else:
+            inserted.append(record)
+
+    deleted_ids = [row_id for ids in current_ids.values() for row_id in ids]
+    return ScheduleDiff(inserted, deleted_ids, unchanged)
@@ -1,23 +1,24 @@
 from pathlib import Path
-import json
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterable, Iterator
+
+from stage_io import save_stage
+from subjects_stream import iter_subjects
 
 
 class SubjectToBuildingsProcessor:
     def __init__(self):
         self.data_dir = Path(__file__).parent / "data"
         self.input_file = self.data_dir / "subjects.json"
-        self.output_file = self.data_dir / "buildings_derived.json"
+        self.output_name = "buildings_derived"
 
-    def load_subject_data(self) -> Dict:
-        with open(self.input_file, "r") as f:
-            return json.load(f)
+    def load_subject_data(self) -> Iterator[Dict]:
+        return iter_subjects(self.input_file)
 
-    def process_to_buildings(self, subject_data: Dict) -> Dict:
+    def process_to_buildings(self, subjects: Iterable[Dict]) -> Dict:
         buildings = {}
 
-        for subject in subject_data["subjects"]:
+        for subject in subjects:
             for course in subject["courses"]:
                 for section in course["sections"]:
                     building_name = section["location"]["building"]
@@ -45,15 +46,14 @@ class SubjectToBuildingsProcessor:
         return {"last_updated": datetime.now().isoformat(), "buildings": buildings}
 
     def save_building_data(self, building_data: Dict):
-        with open(self.output_file, "w") as f:
-            json.dump(building_data, f, indent=2)
+        save_stage(building_data, self.data_dir, self.output_name)
 
     def process(self):
         print("Loading subject data...")
-        subject_data = self.load_subject_data()
+        subjects = self.load_subject_data()
 
         print("Processing subjects into building data...")
-        building_data = self.process_to_buildings(subject_data)
+        building_data = self.process_to_buildings(subjects)
 
         print("Saving building data...")
         self.save_building_data(building_data)
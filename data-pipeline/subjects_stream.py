@@ -0,0 +1,168 @@
+"""Streaming reader and writer for subjects.json.
+
+`SubjectsWriter` writes the same document `json.load` has always read
+(`last_updated`, `year`, `term`, `subjects`), but one
+subject at a time with each subject on its own line, so the scraper never
+holds a whole term in memory. `iter_subjects` reads that layout back one
+subject at a time, and still accepts older indented files.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+SUBJECTS_KEY_LINE = '"subjects": ['
+
+
+class SubjectsWriter:
+    """Write subjects.json incrementally, replacing the target atomically.
+
+    Subjects go to `<path>.partial` as they are written, where
+    `iter_subjects` can already read them. `close` finishes the document
+    and renames it over `path`; leaving the `with` block through an
+    exception discards the partial file instead.
+    """
+    def __init__(self, path: Path, year, term, terms: Optional[List[dict]] = None):
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + ".partial")
+        self.year = year
+        self.term = term
+        self.terms = terms
+        self.subject_count = 0
+        self.course_count = 0
+        self.section_count = 0
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, "w")
+        header = {"last_updated": datetime.now().isoformat(), "year": self.year, "term": self.term}
+        if self.terms:
+            # Merged multi-term output; year and term above are comma-joined
+            header["terms"] = self.terms
+        self._file.write(json.dumps(header, indent=2)[:-2] + ",\n  " + SUBJECTS_KEY_LINE)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is not None:
+            self.discard()
+
+    def write(self, subject: dict):
+        """Append one subject dict ({"code", "name", "courses"})."""
+        self._file.write(",\n    " if self.subject_count else "\n    ")
+        self._file.write(json.dumps(subject))
+        self._file.flush()
+        self.subject_count += 1
+        self.course_count += len(subject["courses"])
+        self.section_count += sum(len(course["sections"]) for course in subject["courses"])
+
+    def close(self):
+        self._file.write("\n  ]\n}\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self.partial_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        self._file = None
+        self.partial_path.unlink(missing_ok=True)
+
+
+def iter_subjects(path: Path) -> Iterator[dict]:
+    """Yield the subjects of a subjects.json file one at a time.
+
+    Works on a `.partial` file still being written, yielding the subjects
+    completed so far.
+    """
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip() == SUBJECTS_KEY_LINE:
+                break
+        else:
+            # Compact or single-line subjects; nothing to stream on
+            f.seek(0)
+            yield from json.load(f)["subjects"]
+            return
+        for line in f:
+            line = line.strip()
+            if line == "{":
+                # Indented layout written by json.dump, one key per line
+                f.seek(0)
+                yield from json.load(f)["subjects"]
+                return
+            if not line:
+                continue
+            if line.startswith("]"):
+                return
+            try:
+                yield json.loads(line.rstrip(","))
+            except json.JSONDecodeError:
+                # The writer is mid-way through this subject
+                return
+
+
+def _index_subjects(path: Path) -> dict:
+    """Map subject code to the file offset of its line in a streamed file."""
+    index = {}
+    with open(path, "rb") as f:
+        for line in iter(f.readline, b""):
+            if line.strip().decode() == SUBJECTS_KEY_LINE:
+                break
+        else:
+            return index
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            stripped = line.strip()
+            if not stripped or stripped.startswith(b"]"):
+                return index
+            code = json.loads(stripped.rstrip(b","))["code"]
+            index.setdefault(code, offset)
+
+
+def _read_subject_at(f, offset: int) -> dict:
+    f.seek(offset)
+    return json.loads(f.readline().strip().rstrip(b","))
+
+
+def merge_subject_files(paths: List[Path], output_path: Path, year, term,
+                        terms: Optional[List[dict]] = None) -> SubjectsWriter:
+    """Merge several terms' subjects.json files by subject code and course number.
+
+    Only one subject per input file is in memory at a time. Sections keep
+    their own start and end dates, so downstream stages can still tell the
+    terms apart; identical sections are kept once.
+    """
+    indexes = [_index_subjects(path) for path in paths]
+    codes = list(dict.fromkeys(code for index in indexes for code in index))
+    files = [open(path, "rb") for path in paths]
+    try:
+        with SubjectsWriter(output_path, year, term, terms=terms) as writer:
+            for code in codes:
+                merged = None
+                courses = {}
+                for f, index in zip(files, indexes):
+                    if code not in index:
+                        continue
+                    subject = _read_subject_at(f, index[code])
+                    if merged is None:
+                        merged = {"code": subject["code"], "name": subject["name"], "courses": []}
+                    for course in subject["courses"]:
+                        merged_course = courses.get(course["number"])
+                        if merged_course is None:
+                            merged_course = {"number": course["number"], "title": course["title"], "sections": []}
+                            merged["courses"].append(merged_course)
+                            courses[course["number"]] = merged_course
+                        for section in course["sections"]:
+                            if section not in merged_course["sections"]:
+                                merged_course["sections"].append(section)
+                writer.write(merged)
+            writer.close()
+    finally:
+        for f in files:
+            f.close()
+    return writer
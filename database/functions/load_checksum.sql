@@ -0,0 +1,54 @@
+CREATE OR REPLACE FUNCTION load_checksum(table_name TEXT)
+RETURNS JSONB AS $$
+DECLARE
+    result JSONB;
+BEGIN
+    -- Rows are rendered the way load_verification.checksum_row renders the
+    -- loaded records: tab-separated, times as HH24:MI, NULLs skipped, sorted
+    -- bytewise
+    IF table_name = 'class_schedule' THEN
+        SELECT jsonb_build_object(
+            'rows', COUNT(*),
+            'md5', md5(COALESCE(string_agg(row_text, E'\n' ORDER BY row_text COLLATE "C"), ''))
+        )
+        INTO result
+        FROM (
+            SELECT concat_ws(
+                E'\t',
+                building_name,
+                room_number,
+                course_code,
+                course_title,
+                to_char(start_time, 'HH24:MI'),
+                to_char(end_time, 'HH24:MI'),
+                day_of_week,
+                to_char(start_date, 'YYYY-MM-DD'),
+                to_char(end_date, 'YYYY-MM-DD')
+            ) AS row_text
+            FROM class_schedule
+        ) AS schedule_rows;
+    ELSIF table_name = 'academic_terms' THEN
+        SELECT jsonb_build_object(
+            'rows', COUNT(*),
+            'md5', md5(COALESCE(string_agg(row_text, E'\n' ORDER BY row_text COLLATE "C"), ''))
+        )
+        INTO result
+        FROM (
+            SELECT concat_ws(
+                E'\t',
+                academic_year,
+                term,
+                part_of_term,
+                to_char(start_date, 'YYYY-MM-DD'),
+                to_char(end_date, 'YYYY-MM-DD')
+            ) AS row_text
+            FROM academic_terms
+        ) AS term_rows;
+    ELSE
+        RAISE EXCEPTION 'load_checksum does not support table %', table_name;
+    END IF;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql STABLE
+SET search_path = pg_catalog, public;
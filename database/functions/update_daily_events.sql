@@ -1,13 +1,74 @@
 CREATE OR REPLACE FUNCTION update_daily_events(events_data JSONB)
-RETURNS TEXT AS $$
+RETURNS JSONB AS $$
 DECLARE
-    inserted_count INTEGER;
+    result JSONB;
 BEGIN
-    DELETE FROM daily_events;
+    -- Serialize syncs; readers keep seeing the old rows until commit
+    LOCK TABLE daily_events IN SHARE ROW EXCLUSIVE MODE;
 
-    inserted_count := COALESCE(jsonb_array_length(events_data), 0);
-
-    IF inserted_count > 0 THEN
+    -- Events are matched on (building, room, start, end, name). The ordinal
+    -- pairs up repeated events with the same key (same occupants first), so
+    -- the table ends up with exactly the rows in events_data, as with the old
+    -- delete-and-insert.
+    WITH incoming AS (
+        SELECT
+            event.*,
+            ROW_NUMBER() OVER (
+                PARTITION BY building_name, room_number, start_time, end_time, event_name
+                ORDER BY occupant
+            ) AS ordinal
+        FROM jsonb_to_recordset(COALESCE(events_data, '[]'::jsonb)) AS event(
+            building_name TEXT,
+            room_number TEXT,
+            event_name TEXT,
+            start_time TIMESTAMPTZ,
+            end_time TIMESTAMPTZ,
+            occupant TEXT
+        )
+    ),
+    existing AS (
+        SELECT
+            id,
+            building_name,
+            room_number,
+            event_name,
+            start_time,
+            end_time,
+            occupant,
+            ROW_NUMBER() OVER (
+                PARTITION BY building_name, room_number, start_time, end_time, event_name
+                ORDER BY occupant, id
+            ) AS ordinal
+        FROM daily_events
+    ),
+    paired AS (
+        SELECT e.id, e.occupant AS old_occupant, i.*
+        FROM incoming i
+        FULL JOIN existing e
+            ON e.building_name = i.building_name
+            AND e.room_number = i.room_number
+            AND e.start_time = i.start_time
+            AND e.end_time = i.end_time
+            AND e.event_name = i.event_name
+            AND e.ordinal = i.ordinal
+    ),
+    removed AS (
+        DELETE FROM daily_events d
+        USING paired p
+        WHERE d.id = p.id
+            AND p.ordinal IS NULL
+        RETURNING 1
+    ),
+    updated AS (
+        UPDATE daily_events d
+        SET occupant = p.occupant
+        FROM paired p
+        WHERE d.id = p.id
+            AND p.ordinal IS NOT NULL
+            AND p.occupant IS DISTINCT FROM p.old_occupant
+        RETURNING 1
+    ),
+    added AS (
         INSERT INTO daily_events (
             building_name,
             room_number,
@@ -17,19 +78,27 @@ BEGIN
             occupant
         )
         SELECT
-            event->>'building_name',
-            event->>'room_number',
-            event->>'event_name',
-            (event->>'start_time')::TIMESTAMPTZ,
-            (event->>'end_time')::TIMESTAMPTZ,
-            event->>'occupant'
-        FROM jsonb_array_elements(events_data) AS event;
-    END IF;
+            building_name,
+            room_number,
+            event_name,
+            start_time,
+            end_time,
+            occupant
+        FROM paired
+        WHERE id IS NULL
+        RETURNING 1
+    )
+    SELECT jsonb_build_object(
+        'added', (SELECT COUNT(*) FROM added),
+        'removed', (SELECT COUNT(*) FROM removed),
+        'updated', (SELECT COUNT(*) FROM updated),
+        'unchanged', (
+            SELECT COUNT(*) FROM paired WHERE id IS NOT NULL AND ordinal IS NOT NULL
+        ) - (SELECT COUNT(*) FROM updated)
+    )
+    INTO result;
 
-    RETURN 'SUCCESS:' || inserted_count;
-EXCEPTION
-    WHEN OTHERS THEN
-        RETURN 'ERROR:' || SQLERRM;
+    RETURN result;
 END;
 $$ LANGUAGE plpgsql
 SET search_path = pg_catalog, public;
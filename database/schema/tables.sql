@@ -91,3 +91,26 @@ CREATE TABLE academic_terms (
     CONSTRAINT valid_term_dates
         CHECK (end_date > start_date)
 );
+
+-- load_to_postgres.py writes the weekly load here, then
+-- promote_schedule_load swaps it into class_schedule and academic_terms in
+-- one transaction. Constraints are checked by that insert.
+CREATE TABLE class_schedule_shadow (
+    building_name TEXT,
+    room_number TEXT,
+    course_code TEXT NOT NULL,
+    course_title TEXT NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    day_of_week CHAR(1) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL
+);
+
+CREATE TABLE academic_terms_shadow (
+    academic_year text,
+    term text,
+    part_of_term CHAR(1),
+    start_date DATE,
+    end_date DATE
+);
@@ -0,0 +1,116 @@
+-- Replace daily_events by diffing against the incoming events instead of
+-- deleting every row and inserting them again: unchanged events keep their
+-- rows and IDs, and the table is never empty mid-update. Returns the added,
+-- removed, updated (occupant only) and unchanged counts. The return type
+-- changes from TEXT, so the function is recreated and its grants restored.
+DROP FUNCTION IF EXISTS public.update_daily_events(jsonb);
+
+CREATE FUNCTION public.update_daily_events(events_data JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    result JSONB;
+BEGIN
+    -- Serialize syncs; readers keep seeing the old rows until commit
+    LOCK TABLE daily_events IN SHARE ROW EXCLUSIVE MODE;
+
+    -- Events are matched on (building, room, start, end, name). The ordinal
+    -- pairs up repeated events with the same key (same occupants first), so
+    -- the table ends up with exactly the rows in events_data, as with the old
+    -- delete-and-insert.
+    WITH incoming AS (
+        SELECT
+            event.*,
+            ROW_NUMBER() OVER (
+                PARTITION BY building_name, room_number, start_time, end_time, event_name
+                ORDER BY occupant
+            ) AS ordinal
+        FROM jsonb_to_recordset(COALESCE(events_data, '[]'::jsonb)) AS event(
+            building_name TEXT,
+            room_number TEXT,
+            event_name TEXT,
+            start_time TIMESTAMPTZ,
+            end_time TIMESTAMPTZ,
+            occupant TEXT
+        )
+    ),
+    existing AS (
+        SELECT
+            id,
+            building_name,
+            room_number,
+            event_name,
+            start_time,
+            end_time,
+            occupant,
+            ROW_NUMBER() OVER (
+                PARTITION BY building_name, room_number, start_time, end_time, event_name
+                ORDER BY occupant, id
+            ) AS ordinal
+        FROM daily_events
+    ),
+    paired AS (
+        SELECT e.id, e.occupant AS old_occupant, i.*
+        FROM incoming i
+        FULL JOIN existing e
+            ON e.building_name = i.building_name
+            AND e.room_number = i.room_number
+            AND e.start_time = i.start_time
+            AND e.end_time = i.end_time
+            AND e.event_name = i.event_name
+            AND e.ordinal = i.ordinal
+    ),
+    removed AS (
+        DELETE FROM daily_events d
+        USING paired p
+        WHERE d.id = p.id
+            AND p.ordinal IS NULL
+        RETURNING 1
+    ),
+    updated AS (
+        UPDATE daily_events d
+        SET occupant = p.occupant
+        FROM paired p
+        WHERE d.id = p.id
+            AND p.ordinal IS NOT NULL
+            AND p.occupant IS DISTINCT FROM p.old_occupant
+        RETURNING 1
+    ),
+    added AS (
+        INSERT INTO daily_events (
+            building_name,
+            room_number,
+            event_name,
+            start_time,
+            end_time,
+            occupant
+        )
+        SELECT
+            building_name,
+            room_number,
+            event_name,
+            start_time,
+            end_time,
+            occupant
+        FROM paired
+        WHERE id IS NULL
+        RETURNING 1
+    )
+    SELECT jsonb_build_object(
+        'added', (SELECT COUNT(*) FROM added),
+        'removed', (SELECT COUNT(*) FROM removed),
+        'updated', (SELECT COUNT(*) FROM updated),
+        'unchanged', (
+            SELECT COUNT(*) FROM paired WHERE id IS NOT NULL AND ordinal IS NOT NULL
+        ) - (SELECT COUNT(*) FROM updated)
+    )
+    INTO result;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = pg_catalog, public;
+
+REVOKE EXECUTE ON FUNCTION public.update_daily_events(jsonb)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.update_daily_events(jsonb)
+    TO service_role;
@@ -0,0 +1,62 @@
+-- Row count and md5 over the canonical rows of a table load_to_postgres.py
+-- replaces, so `load_to_postgres.py --verify checksum` can check a load's
+-- contents in one round trip.
+CREATE OR REPLACE FUNCTION public.load_checksum(table_name TEXT)
+RETURNS JSONB AS $$
+DECLARE
+    result JSONB;
+BEGIN
+    -- Rows are rendered the way load_verification.checksum_row renders the
+    -- loaded records: tab-separated, times as HH24:MI, NULLs skipped, sorted
+    -- bytewise
+    IF table_name = 'class_schedule' THEN
+        SELECT jsonb_build_object(
+            'rows', COUNT(*),
+            'md5', md5(COALESCE(string_agg(row_text, E'\n' ORDER BY row_text COLLATE "C"), ''))
+        )
+        INTO result
+        FROM (
+            SELECT concat_ws(
+                E'\t',
+                building_name,
+                room_number,
+                course_code,
+                course_title,
+                to_char(start_time, 'HH24:MI'),
+                to_char(end_time, 'HH24:MI'),
+                day_of_week,
+                to_char(start_date, 'YYYY-MM-DD'),
+                to_char(end_date, 'YYYY-MM-DD')
+            ) AS row_text
+            FROM class_schedule
+        ) AS schedule_rows;
+    ELSIF table_name = 'academic_terms' THEN
+        SELECT jsonb_build_object(
+            'rows', COUNT(*),
+            'md5', md5(COALESCE(string_agg(row_text, E'\n' ORDER BY row_text COLLATE "C"), ''))
+        )
+        INTO result
+        FROM (
+            SELECT concat_ws(
+                E'\t',
+                academic_year,
+                term,
+                part_of_term,
+                to_char(start_date, 'YYYY-MM-DD'),
+                to_char(end_date, 'YYYY-MM-DD')
+            ) AS row_text
+            FROM academic_terms
+        ) AS term_rows;
+    ELSE
+        RAISE EXCEPTION 'load_checksum does not support table %', table_name;
+    END IF;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql STABLE
+SET search_path = pg_catalog, public;
+
+REVOKE EXECUTE ON FUNCTION public.load_checksum(text)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.load_checksum(text)
+    TO service_role;
@@ -0,0 +1,84 @@
+-- Shadow tables for the weekly schedule load. load_to_postgres.py fills
+-- them, then promote_schedule_load replaces class_schedule and
+-- academic_terms with their contents in one transaction, so readers never
+-- see an empty or partial schedule and a failed load leaves the previous
+-- data in place. Only the service role touches them.
+CREATE TABLE IF NOT EXISTS public.class_schedule_shadow (
+    building_name TEXT,
+    room_number TEXT,
+    course_code TEXT NOT NULL,
+    course_title TEXT NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    day_of_week CHAR(1) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public.academic_terms_shadow (
+    academic_year text,
+    term text,
+    part_of_term CHAR(1),
+    start_date DATE,
+    end_date DATE
+);
+
+ALTER TABLE public.class_schedule_shadow ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.academic_terms_shadow ENABLE ROW LEVEL SECURITY;
+
+REVOKE ALL PRIVILEGES ON TABLE
+    public.class_schedule_shadow,
+    public.academic_terms_shadow
+FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.promote_schedule_load(
+    expected_schedule_rows INTEGER,
+    expected_term_rows INTEGER
+)
+RETURNS JSONB AS $$
+DECLARE
+    schedule_rows INTEGER;
+    term_rows INTEGER;
+BEGIN
+    -- Serialize loads; readers keep seeing the old rows until commit
+    LOCK TABLE class_schedule_shadow, academic_terms_shadow IN EXCLUSIVE MODE;
+    LOCK TABLE class_schedule, academic_terms IN SHARE ROW EXCLUSIVE MODE;
+
+    -- A load that lost or duplicated rows on the way in is not promoted
+    SELECT COUNT(*) INTO schedule_rows FROM class_schedule_shadow;
+    SELECT COUNT(*) INTO term_rows FROM academic_terms_shadow;
+    IF schedule_rows <> expected_schedule_rows OR term_rows <> expected_term_rows THEN
+        RAISE EXCEPTION
+            'Shadow tables hold % class_schedule and % academic_terms rows, expected % and %',
+            schedule_rows, term_rows, expected_schedule_rows, expected_term_rows;
+    END IF;
+
+    DELETE FROM class_schedule;
+    INSERT INTO class_schedule (
+        building_name, room_number, course_code, course_title,
+        start_time, end_time, day_of_week, start_date, end_date
+    )
+    SELECT
+        building_name, room_number, course_code, course_title,
+        start_time, end_time, day_of_week, start_date, end_date
+    FROM class_schedule_shadow;
+
+    DELETE FROM academic_terms;
+    INSERT INTO academic_terms (academic_year, term, part_of_term, start_date, end_date)
+    SELECT academic_year, term, part_of_term, start_date, end_date
+    FROM academic_terms_shadow;
+
+    TRUNCATE class_schedule_shadow, academic_terms_shadow;
+
+    RETURN jsonb_build_object(
+        'class_schedule', schedule_rows,
+        'academic_terms', term_rows
+    );
+END;
+$$ LANGUAGE plpgsql
+SET search_path = pg_catalog, public;
+
+REVOKE EXECUTE ON FUNCTION public.promote_schedule_load(integer, integer)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.promote_schedule_load(integer, integer)
+    TO service_role;
@@ -0,0 +1,87 @@
+-- Let promote_schedule_load apply a diff load: with deleted_schedule_ids,
+-- only those class_schedule rows are deleted and the shadow rows added,
+-- instead of replacing the table. expected_schedule_rows is now the row
+-- count class_schedule must have after promotion in both modes. The
+-- signature changes, so the function is recreated and its grants restored.
+DROP FUNCTION IF EXISTS public.promote_schedule_load(integer, integer);
+
+CREATE FUNCTION public.promote_schedule_load(
+    expected_schedule_rows INTEGER,
+    expected_term_rows INTEGER,
+    deleted_schedule_ids BIGINT[] DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    shadow_rows INTEGER;
+    term_rows INTEGER;
+    removed_rows INTEGER;
+    schedule_rows INTEGER;
+BEGIN
+    -- Serialize loads; readers keep seeing the old rows until commit
+    LOCK TABLE class_schedule_shadow, academic_terms_shadow IN EXCLUSIVE MODE;
+    LOCK TABLE class_schedule, academic_terms IN SHARE ROW EXCLUSIVE MODE;
+
+    SELECT COUNT(*) INTO shadow_rows FROM class_schedule_shadow;
+    SELECT COUNT(*) INTO term_rows FROM academic_terms_shadow;
+    IF term_rows <> expected_term_rows THEN
+        RAISE EXCEPTION 'academic_terms_shadow holds % rows, expected %',
+            term_rows, expected_term_rows;
+    END IF;
+
+    -- Without deleted_schedule_ids the shadow rows replace class_schedule;
+    -- with them (a diff load) only those rows are deleted and the shadow
+    -- rows added
+    IF deleted_schedule_ids IS NULL THEN
+        DELETE FROM class_schedule;
+        GET DIAGNOSTICS removed_rows = ROW_COUNT;
+    ELSE
+        DELETE FROM class_schedule WHERE id = ANY(deleted_schedule_ids);
+        GET DIAGNOSTICS removed_rows = ROW_COUNT;
+        IF removed_rows <> cardinality(deleted_schedule_ids) THEN
+            RAISE EXCEPTION
+                'Deleted % class_schedule rows, expected %; the table changed since the diff',
+                removed_rows, cardinality(deleted_schedule_ids);
+        END IF;
+    END IF;
+
+    INSERT INTO class_schedule (
+        building_name, room_number, course_code, course_title,
+        start_time, end_time, day_of_week, start_date, end_date
+    )
+    SELECT
+        building_name, room_number, course_code, course_title,
+        start_time, end_time, day_of_week, start_date, end_date
+    FROM class_schedule_shadow;
+
+    -- A load that lost or duplicated rows on the way in is not promoted
+    IF deleted_schedule_ids IS NULL THEN
+        schedule_rows := shadow_rows;
+    ELSE
+        SELECT COUNT(*) INTO schedule_rows FROM class_schedule;
+    END IF;
+    IF schedule_rows <> expected_schedule_rows THEN
+        RAISE EXCEPTION 'class_schedule would hold % rows, expected %',
+            schedule_rows, expected_schedule_rows;
+    END IF;
+
+    DELETE FROM academic_terms;
+    INSERT INTO academic_terms (academic_year, term, part_of_term, start_date, end_date)
+    SELECT academic_year, term, part_of_term, start_date, end_date
+    FROM academic_terms_shadow;
+
+    TRUNCATE class_schedule_shadow, academic_terms_shadow;
+
+    RETURN jsonb_build_object(
+        'class_schedule', schedule_rows,
+        'academic_terms', term_rows,
+        'inserted', shadow_rows,
+        'deleted', removed_rows
+    );
+END;
+$$ LANGUAGE plpgsql
+SET search_path = pg_catalog, public;
+
+REVOKE EXECUTE ON FUNCTION public.promote_schedule_load(integer, integer, bigint[])
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.promote_schedule_load(integer, integer, bigint[])
+    TO service_role;